@@ -0,0 +1,25 @@
+"""add_flagged_cards_user_deck_index
+
+Revision ID: 0006_flagged_user_deck_idx
+Revises: 0005_add_flagged_cards
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_flagged_user_deck_idx'
+down_revision: Union[str, None] = '0005_add_flagged_cards'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Composite index for the deck-scoped flagged card lookups (user + deck)
+    op.create_index('ix_flagged_cards_user_deck', 'flagged_cards', ['user_id', 'deck_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_flagged_cards_user_deck', table_name='flagged_cards')
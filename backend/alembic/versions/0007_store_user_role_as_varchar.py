@@ -0,0 +1,47 @@
+"""store_user_role_as_varchar
+
+Revision ID: 0007_user_role_varchar
+Revises: 0006_flagged_user_deck_idx
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_user_role_varchar'
+down_revision: Union[str, None] = '0006_flagged_user_deck_idx'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Convert users.role from the native user_role enum to VARCHAR(16) + CHECK
+    op.alter_column('users', 'role', server_default=None)
+    op.alter_column(
+        'users',
+        'role',
+        type_=sa.String(length=16),
+        existing_nullable=False,
+        postgresql_using='role::text',
+    )
+    op.alter_column('users', 'role', server_default='USER')
+    sa.Enum(name='user_role').drop(op.get_bind(), checkfirst=True)
+    op.create_check_constraint('user_role', 'users', "role IN ('USER', 'ADMIN')")
+
+
+def downgrade() -> None:
+    op.drop_constraint('user_role', 'users', type_='check')
+    user_role_enum = sa.Enum('USER', 'ADMIN', name='user_role')
+    user_role_enum.create(op.get_bind(), checkfirst=True)
+    op.alter_column('users', 'role', server_default=None)
+    op.alter_column(
+        'users',
+        'role',
+        type_=user_role_enum,
+        existing_nullable=False,
+        postgresql_using='role::user_role',
+    )
+    op.alter_column('users', 'role', server_default='USER')
@@ -0,0 +1,26 @@
+"""drop_redundant_flagged_cards_user_index
+
+Revision ID: 0008_drop_flagged_user_idx
+Revises: 0007_user_role_varchar
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_drop_flagged_user_idx'
+down_revision: Union[str, None] = '0007_user_role_varchar'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # user_id is the leading column of both uix_user_card_flag and
+    # ix_flagged_cards_user_deck, so the single-column index is never needed
+    op.drop_index('ix_flagged_cards_user_id', table_name='flagged_cards')
+
+
+def downgrade() -> None:
+    op.create_index('ix_flagged_cards_user_id', 'flagged_cards', ['user_id'])
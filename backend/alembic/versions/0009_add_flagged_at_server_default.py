@@ -0,0 +1,26 @@
+"""add_flagged_at_server_default
+
+Revision ID: 0009_flagged_at_default
+Revises: 0008_drop_flagged_user_idx
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0009_flagged_at_default'
+down_revision: Union[str, None] = '0008_drop_flagged_user_idx'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Let the database stamp new flags so inserts don't need to send a timestamp
+    op.alter_column('flagged_cards', 'flagged_at', server_default=sa.func.now())
+
+
+def downgrade() -> None:
+    op.alter_column('flagged_cards', 'flagged_at', server_default=None)
@@ -0,0 +1,41 @@
+"""add_responses_count_to_user_deck_progress
+
+Revision ID: 0010_progress_responses_count
+Revises: 0009_flagged_at_default
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0010_progress_responses_count'
+down_revision: Union[str, None] = '0009_flagged_at_default'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'user_deck_progress',
+        sa.Column('responses_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    # Backfill from the answers recorded so far
+    op.execute(
+        """
+        UPDATE user_deck_progress
+        SET responses_count = (
+            SELECT COUNT(quiz_responses.id)
+            FROM quiz_responses
+            JOIN quiz_sessions ON quiz_sessions.id = quiz_responses.session_id
+            WHERE quiz_sessions.user_id = user_deck_progress.user_id
+              AND quiz_sessions.deck_id = user_deck_progress.deck_id
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('user_deck_progress', 'responses_count')
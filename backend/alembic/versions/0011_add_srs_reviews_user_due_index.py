@@ -0,0 +1,25 @@
+"""add_srs_reviews_user_due_index
+
+Revision ID: 0011_srs_user_due_idx
+Revises: 0010_progress_responses_count
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0011_srs_user_due_idx'
+down_revision: Union[str, None] = '0010_progress_responses_count'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Composite index so the due-review listing is a range scan in due order
+    op.create_index('ix_srs_reviews_user_due', 'srs_reviews', ['user_id', 'due_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_srs_reviews_user_due', table_name='srs_reviews')
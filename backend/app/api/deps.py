@@ -1,19 +1,134 @@
+import hashlib
+import time
+from threading import Lock
+from typing import Callable
+
 from fastapi import Depends, HTTPException, status
 from jose import JWTError
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession, make_transient_to_detached, object_session
 from sqlmodel import Session
 
+from ..core.cache import TTLCache
 from ..core.security import oauth2_scheme, oauth2_scheme_optional
 from ..db.session import get_db
 from ..models import User, UserRole
 from ..services.auth import decode_token
 
+TOKEN_CACHE_TTL_SECONDS = 30
+USER_CACHE_TTL_SECONDS = 30
+
+# Verified access-token payloads keyed by a digest of the raw bearer token.
+_token_cache: TTLCache[str, dict] = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL_SECONDS)
+# Column snapshots of recently authenticated users keyed by user id. Entries
+# are dropped once an ORM change to the user commits in this process; bulk
+# update(User)/delete(User) statements bypass the mapper events and don't
+# invalidate, and other worker processes keep serving their snapshot for up to
+# USER_CACHE_TTL_SECONDS.
+_user_cache: TTLCache[int, dict] = TTLCache(maxsize=5_000, ttl=USER_CACHE_TTL_SECONDS)
+# Secrets are never kept in snapshots; they load from the row on first access,
+# which must happen off the event loop (see load_user_secrets).
+_UNCACHED_USER_FIELDS = ("hashed_password", "openai_api_key")
+# Bumped on every invalidation so a load that raced a commit isn't cached.
+_user_cache_version = 0
+_user_cache_lock = Lock()
+# Session.info key collecting users changed by a session's pending transaction.
+_CHANGED_USER_IDS = "changed_user_ids"
+
+
+def _token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def _decode_access_token(token: str) -> dict:
+    """Decode an access token, reusing the verified payload for a repeat bearer.
+
+    Failed verifications raise before anything is stored, and entries never
+    outlive the token's own ``exp`` claim.
+    """
+    key = _token_cache_key(token)
+    payload = _token_cache.get(key)
+    if payload is None:
+        payload = decode_token(token, token_type="access")
+        ttl = min(TOKEN_CACHE_TTL_SECONDS, payload.get("exp", 0) - time.time())
+        if ttl > 0:
+            _token_cache.set(key, payload, ttl=ttl)
+    return payload
+
+
+def invalidate_token(token: str) -> None:
+    """Drop a bearer token's cached payload, e.g. on logout."""
+    _token_cache.pop(_token_cache_key(token))
+
+
+def _load_user(db: Session, user_id: int) -> User | None:
+    """Return the user attached to ``db``, skipping the SELECT on a cache hit.
+
+    Cached snapshots are merged with ``load=False`` so the instance behaves
+    like a freshly loaded row and can still be modified and committed.
+    """
+    state = _user_cache.get(user_id)
+    if state is not None:
+        user = User(**state)
+        make_transient_to_detached(user)
+        user = db.merge(user, load=False)
+        db.expire(user, _UNCACHED_USER_FIELDS)
+        return user
+
+    version = _user_cache_version
+    user = db.get(User, user_id)
+    if user is not None:
+        with _user_cache_lock:
+            if version == _user_cache_version:
+                _user_cache.set(user_id, user.model_dump(exclude=set(_UNCACHED_USER_FIELDS)))
+    return user
+
+
+def load_user_secrets(user: User) -> User:
+    """Load the fields left out of cached snapshots.
+
+    Reading them triggers a SELECT on a cache hit, so call this from sync code
+    (a dependency or the threadpool) before async code such as the LLM service
+    reads the API key.
+    """
+    for field in _UNCACHED_USER_FIELDS:
+        getattr(user, field)
+    return user
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _record_changed_user(mapper, connection, target: User) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_USER_IDS, set()).add(target.id)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_committed_users(session: OrmSession) -> None:
+    """Drop cached users once their changes are committed and visible to new loads."""
+    global _user_cache_version
+
+    user_ids = session.info.pop(_CHANGED_USER_IDS, None)
+    if user_ids:
+        with _user_cache_lock:
+            _user_cache_version += 1
+            for user_id in user_ids:
+                _user_cache.pop(user_id)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _forget_rolled_back_users(session: OrmSession) -> None:
+    session.info.pop(_CHANGED_USER_IDS, None)
+
 
 def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme),
 ) -> User:
     try:
-        payload = decode_token(token, token_type="access")
+        payload = _decode_access_token(token)
     except HTTPException:
         raise
     except JWTError as exc:  # pragma: no cover
@@ -23,7 +138,7 @@ def get_current_user(
     if user_id is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-    user = db.get(User, int(user_id))
+    user = _load_user(db, int(user_id))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
@@ -36,25 +151,36 @@ def get_current_user_optional(
     if not token:
         return None
     try:
-        payload = decode_token(token, token_type="access")
+        payload = _decode_access_token(token)
     except HTTPException:
         return None
     user_id = payload.get("sub")
     if not user_id:
         return None
-    return db.get(User, int(user_id))
+    return _load_user(db, int(user_id))
+
+
+def _require(active: bool = True, admin: bool = False) -> Callable[..., User]:
+    """Build a dependency that loads the current user once and applies the requested checks."""
+
+    def dependency(current_user: User = Depends(get_current_user)) -> User:
+        if active and not current_user.is_active:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
+        if admin and current_user.role != UserRole.ADMIN:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+        return current_user
+
+    return dependency
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
-    if not current_user.is_active:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
-    return current_user
+# Built once so FastAPI's per-request dependency cache keys on a stable callable
+get_current_active_user = _require()
+get_current_admin = _require(admin=True)
 
 
-def get_current_admin(current_user: User = Depends(get_current_active_user)) -> User:
-    if current_user.role != UserRole.ADMIN:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
-    return current_user
+def get_current_llm_user(current_user: User = Depends(get_current_active_user)) -> User:
+    """Active user with their LLM settings loaded, for async routes that call the LLM service."""
+    return load_user_secrets(current_user)
 
 
 def get_db_session() -> Session:
@@ -3,16 +3,20 @@ API routes for AI-powered deck generation.
 Handles file uploads, parsing, and LLM-based flashcard generation.
 """
 
-from typing import Any, Dict, List
+import re
+from typing import Annotated, Any, AsyncIterator, Dict, List, Literal, Optional, Union
 
+import orjson
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi.responses import StreamingResponse
 from loguru import logger
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Discriminator, Field, Tag, model_validator
 from sqlmodel import Session
 
-from ...api.deps import get_current_active_user
+from ...api.deps import get_current_active_user, get_current_llm_user
 from ...db.session import get_db
-from ...models import User
+from ...models import CardType, User
+from ...schemas.card import CardCreate
 from ...schemas.deck import DeckCreate, DeckRead
 from ...services.file_parser import file_parser_service
 from ...services.llm_service import llm_service
@@ -20,6 +24,9 @@ from ...services import decks as deck_service
 
 router = APIRouter(prefix="/ai-decks", tags=["ai-decks"])
 
+# Cloze prompts mark each blank with [BLANK] (any case)
+_BLANK_RE = re.compile(r"\[BLANK\]", re.IGNORECASE)
+
 
 class OllamaStatusResponse(BaseModel):
     """Response model for Ollama availability check"""
@@ -55,11 +62,27 @@ async def check_ollama_status() -> OllamaStatusResponse:
         )
 
 
+async def _extract_file_content(file: UploadFile, user: User) -> str:
+    """Parse an uploaded file and reject content too short to generate cards from"""
+    logger.info(f"Parsing file {file.filename} for user {user.id}")
+    # Only the first MAX_CONTENT_LENGTH characters reach the LLM, so stop extracting after that
+    content = await file_parser_service.parse_file(file, max_chars=llm_service.MAX_CONTENT_LENGTH)
+
+    if not llm_service.has_enough_content(content):
+        raise HTTPException(
+            status_code=400,
+            detail="File content is too short. Please upload a file with more substantial content."
+        )
+
+    logger.info(f"Extracted {len(content)} characters from {file.filename}")
+    return content
+
+
 @router.post("/generate-from-file", response_model=GeneratedCardsResponse)
 async def generate_cards_from_file(
     file: UploadFile = File(..., description="PDF, PPT, DOCX, or TXT file"),
     num_cards: int = Form(..., ge=5, le=20, description="Number of flashcards to generate (5-20)"),
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_llm_user),
 ) -> GeneratedCardsResponse:
     """
     Generate flashcards from an uploaded file using AI.
@@ -82,16 +105,7 @@ async def generate_cards_from_file(
     """
     try:
         # Step 1: Parse the uploaded file
-        logger.info(f"Parsing file {file.filename} for user {current_user.id}")
-        content = await file_parser_service.parse_file(file)
-
-        if not content or len(content.strip()) < 50:
-            raise HTTPException(
-                status_code=400,
-                detail="File content is too short. Please upload a file with more substantial content."
-            )
-
-        logger.info(f"Extracted {len(content)} characters from {file.filename}")
+        content = await _extract_file_content(file, current_user)
 
         # Step 2: Generate flashcards using LLM
         logger.info(f"Generating {num_cards} flashcards using LLM for user {current_user.id}")
@@ -118,16 +132,133 @@ async def generate_cards_from_file(
         )
 
 
+@router.post("/generate-from-file/stream")
+async def stream_cards_from_file(
+    file: UploadFile = File(..., description="PDF, PPT, DOCX, or TXT file"),
+    num_cards: int = Form(..., ge=5, le=20, description="Number of flashcards to generate (5-20)"),
+    current_user: User = Depends(get_current_llm_user),
+) -> StreamingResponse:
+    """
+    Generate flashcards from an uploaded file, streaming each card as it is produced.
+
+    Same input as /generate-from-file, but the response is newline-delimited
+    JSON with one card object per line, so the client can render cards while
+    the LLM is still generating. Errors that happen after streaming has
+    started are sent as a final {"error": "..."} line.
+
+    Args:
+        file: Uploaded file (PDF, PPT, DOCX, or TXT)
+        num_cards: Number of flashcards to generate (5-20)
+        current_user: Authenticated user
+
+    Returns:
+        StreamingResponse with application/x-ndjson content
+    """
+    content = await _extract_file_content(file, current_user)
+    cards = await llm_service.stream_flashcards(
+        content=content,
+        num_cards=num_cards,
+        user=current_user
+    )
+
+    async def ndjson() -> AsyncIterator[bytes]:
+        count = 0
+        try:
+            async for card in cards:
+                count += 1
+                yield orjson.dumps(card) + b"\n"
+        except HTTPException as e:
+            yield orjson.dumps({"error": e.detail}) + b"\n"
+        except Exception as e:
+            logger.error(f"Error streaming flashcards from file: {str(e)}")
+            yield orjson.dumps({"error": f"Failed to generate flashcards: {str(e)}"}) + b"\n"
+        else:
+            logger.info(f"Successfully streamed {count} flashcards")
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+class BasicGeneratedCard(BaseModel):
+    """A reviewed basic card submitted for deck creation"""
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    type: Literal["basic"] = "basic"
+    prompt: str = Field(..., min_length=1)
+    answer: str = Field(..., min_length=1)
+    explanation: Optional[str] = None
+
+
+class ShortAnswerGeneratedCard(BasicGeneratedCard):
+    """A reviewed short answer card submitted for deck creation"""
+    type: Literal["short_answer"]
+
+
+class MultipleChoiceGeneratedCard(BasicGeneratedCard):
+    """A reviewed multiple choice card; the answer must be one of the options"""
+    type: Literal["multiple_choice"]
+    options: List[str] = Field(..., min_length=2)
+
+    @model_validator(mode="after")
+    def check_answer_in_options(self) -> "MultipleChoiceGeneratedCard":
+        if self.answer not in self.options:
+            raise ValueError("Answer must be one of the options")
+        return self
+
+
+class ClozeData(BaseModel):
+    """Answers for each [BLANK] in a cloze prompt, in order"""
+    model_config = ConfigDict(extra="allow")
+
+    blanks: List[Dict[str, Any]] = Field(..., min_length=1)
+
+
+class ClozeGeneratedCard(BasicGeneratedCard):
+    """A reviewed cloze card; needs one cloze_data blank per [BLANK] marker"""
+    type: Literal["cloze"]
+    cloze_data: ClozeData
+
+    @model_validator(mode="after")
+    def check_blank_count(self) -> "ClozeGeneratedCard":
+        blank_count = len(_BLANK_RE.findall(self.prompt))
+        if not blank_count:
+            raise ValueError("Cloze cards must contain at least one [BLANK]")
+        if blank_count != len(self.cloze_data.blanks):
+            raise ValueError(
+                f"Number of [BLANK]s ({blank_count}) must match number of answers in cloze_data ({len(self.cloze_data.blanks)})"
+            )
+        return self
+
+
+def _generated_card_type(card: Any) -> str:
+    """Discriminate generated cards on "type", defaulting to basic when it is missing"""
+    if isinstance(card, dict):
+        return card.get("type", "basic")
+    return getattr(card, "type", "basic")
+
+
+GeneratedCard = Annotated[
+    Union[
+        Annotated[BasicGeneratedCard, Tag("basic")],
+        Annotated[ShortAnswerGeneratedCard, Tag("short_answer")],
+        Annotated[MultipleChoiceGeneratedCard, Tag("multiple_choice")],
+        Annotated[ClozeGeneratedCard, Tag("cloze")],
+    ],
+    Discriminator(_generated_card_type),
+]
+
+
 class CreateDeckFromCardsRequest(BaseModel):
     """Request model for creating a deck from generated cards"""
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     title: str = Field(..., min_length=1, max_length=200)
     description: str = ""
     tag_names: List[str] = Field(default_factory=list)
-    cards: List[Dict[str, Any]] = Field(..., min_items=1)
+    cards: List[GeneratedCard] = Field(..., min_length=1)
 
 
 @router.post("/create-deck", response_model=DeckRead)
-async def create_deck_from_generated_cards(
+def create_deck_from_generated_cards(
     payload: CreateDeckFromCardsRequest,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
@@ -147,72 +278,13 @@ async def create_deck_from_generated_cards(
         Created deck with all cards
     """
     try:
-        # Transform cards to the format expected by DeckCreate
-        cards_data = []
-        for i, card in enumerate(payload.cards):
-            card_type = card.get("type", "basic")
-            prompt = card.get("prompt", "").strip()
-            answer = card.get("answer", "").strip()
-
-            # Basic validation
-            if not prompt:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Card {i + 1}: Prompt is required"
-                )
-            if not answer:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Card {i + 1}: Answer is required"
-                )
-
-            card_data = {
-                "type": card_type,
-                "prompt": prompt,
-                "answer": answer,
-                "explanation": card.get("explanation")
-            }
-
-            # Add type-specific fields with validation
-            if card_type == "multiple_choice":
-                options = card.get("options", [])
-                if not options or len(options) < 2:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Card {i + 1}: Multiple choice cards must have at least 2 options"
-                    )
-                if answer not in options:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Card {i + 1}: Answer must be one of the options"
-                    )
-                card_data["options"] = options
-
-            elif card_type == "cloze":
-                cloze_data = card.get("cloze_data", {})
-                if not cloze_data or "blanks" not in cloze_data or not cloze_data["blanks"]:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Card {i + 1}: Cloze cards must have cloze_data with blanks"
-                    )
-                if "[BLANK]" not in prompt.upper():
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Card {i + 1}: Cloze cards must contain at least one [BLANK]"
-                    )
-                # Validate that number of [BLANK]s matches number of blanks in cloze_data
-                blank_count = prompt.upper().count("[BLANK]")
-                if blank_count != len(cloze_data["blanks"]):
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Card {i + 1}: Number of [BLANK]s ({blank_count}) must match number of answers in cloze_data ({len(cloze_data['blanks'])})"
-                    )
-                card_data["cloze_data"] = cloze_data
-
-            cards_data.append(card_data)
-
-        # Create DeckCreate schema
-        deck_create = DeckCreate(
+        # Cards were validated per type when the request was parsed, so build
+        # the DeckCreate schema without validating everything a second time
+        cards_data = [
+            CardCreate.model_construct(**{**card.model_dump(), "type": CardType(card.type)})
+            for card in payload.cards
+        ]
+        deck_create = DeckCreate.model_construct(
             title=payload.title,
             description=payload.description,
             is_public=False,  # AI-generated decks are private by default
@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session
 
+from ...api.deps import invalidate_token
+from ...core.security import oauth2_scheme_optional
 from ...db.session import get_db
 from ...models import User
 from ...services import auth as auth_service
@@ -30,8 +32,10 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 
 
 @router.post("/logout", response_model=Message)
-def logout() -> Message:
+def logout(token: str | None = Depends(oauth2_scheme_optional)) -> Message:
     # Client should drop tokens; server retains stateless JWT.
+    if token:
+        invalidate_token(token)
     return Message(message="Logged out")
 
 
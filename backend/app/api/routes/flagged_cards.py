@@ -10,7 +10,12 @@ from ...db.session import get_db
 from ...models import User
 from ...schemas.card import CardRead
 from ...schemas.common import Message
-from ...schemas.flagged_card import FlaggedCardCreate, FlaggedCardDelete, FlaggedCardRead
+from ...schemas.flagged_card import (
+    FlaggedCardBulkCreate,
+    FlaggedCardCreate,
+    FlaggedCardDelete,
+    FlaggedCardRead,
+)
 from ...services import flagged_cards as flagged_cards_service
 
 router = APIRouter(prefix="/flagged-cards", tags=["flagged-cards"])
@@ -31,6 +36,21 @@ def flag_card(
     return flagged_cards_service.flag_card(db, current_user, payload)
 
 
+@router.post("/bulk", response_model=List[FlaggedCardRead], status_code=status.HTTP_201_CREATED)
+def flag_cards_bulk(
+    payload: FlaggedCardBulkCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+) -> List[FlaggedCardRead]:
+    """
+    Flag several cards for review in one request.
+
+    Cards that are already flagged return their existing flag. If any card
+    doesn't exist or doesn't belong to its deck, nothing is flagged.
+    """
+    return flagged_cards_service.flag_cards_bulk(db, current_user, payload.cards)
+
+
 @router.delete("/{card_id}", response_model=Message)
 def unflag_card(
     card_id: int,
@@ -118,5 +138,5 @@ def get_flagged_count_for_deck(
 
     Returns the number of flagged cards for the specified deck.
     """
-    cards = flagged_cards_service.get_flagged_card_ids_for_deck(db, current_user, deck_id)
-    return {"count": len(cards)}
+    count = flagged_cards_service.count_flagged_for_deck(db, current_user, deck_id)
+    return {"count": count}
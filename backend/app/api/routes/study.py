@@ -1,7 +1,10 @@
+from typing import List
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
 
-from ...api.deps import get_current_active_user
+from ...api.deps import get_current_active_user, load_user_secrets
 from ...db.session import get_db
 from ...models import Card, QuizSession, User
 from ...schemas.common import Message
@@ -9,6 +12,7 @@ from ...schemas.study import (
     ActivityData,
     DueReviewCard,
     SessionStatistics,
+    StudyAnswerBulkCreate,
     StudyAnswerCreate,
     StudyAnswerRead,
     StudySessionCreate,
@@ -40,6 +44,17 @@ def read_study_session(
     return StudySessionRead.model_validate(session)
 
 
+def _load_session_and_card(db: Session, session_id: int, card_id: int, user: User) -> tuple[QuizSession, Card]:
+    session = study_service.get_session_or_404(db, session_id, user)
+    card = db.get(Card, card_id)
+    if not card or card.deck_id != session.deck_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Card not part of session deck")
+    if study_service.is_llm_graded(session, card):
+        # The LLM check reads the user's API key on the event loop
+        load_user_secrets(user)
+    return session, card
+
+
 @router.post("/sessions/{session_id}/answer", response_model=StudyAnswerRead)
 async def submit_answer(
     session_id: int,
@@ -47,10 +62,7 @@ async def submit_answer(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ) -> StudyAnswerRead:
-    session = study_service.get_session_or_404(db, session_id, current_user)
-    card = db.get(Card, payload.card_id)
-    if not card or card.deck_id != session.deck_id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Card not part of session deck")
+    session, card = await run_in_threadpool(_load_session_and_card, db, session_id, payload.card_id, current_user)
     response, llm_feedback = await study_service.record_answer(db, session, card, current_user, payload)
 
     # Create response dict with LLM feedback
@@ -60,6 +72,39 @@ async def submit_answer(
     return StudyAnswerRead(**response_dict)
 
 
+def _load_session_and_cards(
+    db: Session, session_id: int, card_ids: List[int], user: User
+) -> tuple[QuizSession, List[Card]]:
+    session = study_service.get_session_or_404(db, session_id, user)
+    cards = {card.id: card for card in db.exec(select(Card).where(Card.id.in_(set(card_ids))))}
+    for card_id in card_ids:
+        card = cards.get(card_id)
+        if not card or card.deck_id != session.deck_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Card not part of session deck")
+    if any(study_service.is_llm_graded(session, card) for card in cards.values()):
+        # The LLM checks read the user's API key on the event loop
+        load_user_secrets(user)
+    return session, [cards[card_id] for card_id in card_ids]
+
+
+@router.post("/sessions/{session_id}/answers", response_model=List[StudyAnswerRead])
+async def submit_answers(
+    session_id: int,
+    payload: StudyAnswerBulkCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+) -> List[StudyAnswerRead]:
+    """Submit several answers at once; they are saved in a single transaction."""
+    card_ids = [answer.card_id for answer in payload.answers]
+    session, cards = await run_in_threadpool(_load_session_and_cards, db, session_id, card_ids, current_user)
+    results = await study_service.record_answers_bulk(db, session, cards, current_user, payload.answers)
+
+    return [
+        StudyAnswerRead.model_validate(response).model_copy(update={"llm_feedback": llm_feedback})
+        for response, llm_feedback in results
+    ]
+
+
 @router.post("/sessions/{session_id}/finish", response_model=StudySessionRead)
 def finish_session(
     session_id: int,
@@ -0,0 +1,43 @@
+"""In-process per-key rate limiting."""
+
+from threading import Lock
+from time import monotonic
+from typing import Generic, Hashable, TypeVar
+
+from .cache import TTLCache
+
+K = TypeVar("K", bound=Hashable)
+
+
+class TokenBucket(Generic[K]):
+    """Per-key token buckets holding up to ``capacity`` tokens.
+
+    Each key starts full and regains ``capacity`` tokens every ``period``
+    seconds, so bursts of up to ``capacity`` requests are allowed but the
+    sustained rate is ``capacity / period``. A bucket left alone for a whole
+    period is full again, so idle keys simply expire from the underlying
+    TTLCache; at most ``maxsize`` keys are tracked.
+    """
+
+    def __init__(self, capacity: int, period: float, maxsize: int = 10_000) -> None:
+        self.capacity = capacity
+        self.period = period
+        self._refill_rate = capacity / period
+        self._buckets: TTLCache[K, tuple[float, float]] = TTLCache(maxsize=maxsize, ttl=period)
+        self._lock = Lock()
+
+    def try_acquire(self, key: K, tokens: float = 1) -> bool:
+        """Take ``tokens`` from ``key``'s bucket, or return False if it has too few."""
+        now = monotonic()
+        with self._lock:
+            available, updated_at = self._buckets.get(key, (self.capacity, now))
+            available = min(self.capacity, available + (now - updated_at) * self._refill_rate)
+            allowed = available >= tokens
+            if allowed:
+                available -= tokens
+            self._buckets.set(key, (available, now))
+        return allowed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
@@ -8,13 +8,17 @@ from .api.api_v1 import api_router
 from .core.config import settings
 from .core.logging import configure_logging
 from .db.init_db import init_db
+from .services.file_parser import shutdown_process_pool
+from .services.llm_service import close_http_client
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-    """FastAPI lifespan handler to initialize database resources."""
+    """FastAPI lifespan handler to initialize and release shared resources."""
     await init_db()
     yield
+    await close_http_client()
+    shutdown_process_pool()
 
 
 def create_application() -> FastAPI:
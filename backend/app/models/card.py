@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from pydantic import ConfigDict
 from sqlalchemy import ARRAY, JSON, Column, DateTime, Enum, Text, func
@@ -7,6 +7,11 @@ from sqlmodel import Field, Relationship, SQLModel
 
 from .enums import CardType
 
+if TYPE_CHECKING:
+    from .deck import Deck
+    from .flagged_card import FlaggedCard
+    from .study import QuizResponse, SRSReview
+
 # Ensure the database enum stores the value (e.g. "multiple_choice") instead of the Enum name.
 card_type_enum = Enum(
     CardType,
@@ -55,7 +60,3 @@ class Card(SQLModel, table=True):
     quiz_responses: list["QuizResponse"] = Relationship(back_populates="card")
     srs_reviews: list["SRSReview"] = Relationship(back_populates="card")
     flagged_by_users: list["FlaggedCard"] = Relationship(back_populates="card")
-
-
-from .deck import Deck  # noqa: E402
-from .study import QuizResponse, SRSReview  # noqa: E402
@@ -1,9 +1,16 @@
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from sqlalchemy import JSON, Column, DateTime, String, Text, func
 from sqlmodel import Field, Relationship, SQLModel
 
+if TYPE_CHECKING:
+    from .card import Card
+    from .flagged_card import FlaggedCard
+    from .study import QuizSession, UserDeckProgress
+    from .tag import Tag
+    from .user import User
+
 
 class DeckTagLink(SQLModel, table=True):
     __tablename__ = "deck_tags"
@@ -49,10 +56,3 @@ class Deck(SQLModel, table=True):
     progresses: list["UserDeckProgress"] = Relationship(back_populates="deck", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
     quiz_sessions: list["QuizSession"] = Relationship(back_populates="deck", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
     flagged_cards: list["FlaggedCard"] = Relationship(back_populates="deck", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
-
-
-from .card import Card  # noqa: E402
-from .study import QuizSession, UserDeckProgress  # noqa: E402
-from .tag import Tag  # noqa: E402
-from .user import User  # noqa: E402
-
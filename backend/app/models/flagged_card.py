@@ -1,22 +1,30 @@
 """Flagged Card model for marking cards for review."""
 
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from pydantic import ConfigDict
-from sqlalchemy import Column, DateTime, UniqueConstraint, func
+from sqlalchemy import Column, DateTime, Index, UniqueConstraint, func
 from sqlmodel import Field, Relationship, SQLModel
 
+if TYPE_CHECKING:
+    from .card import Card
+    from .deck import Deck
+    from .user import User
+
 
 class FlaggedCard(SQLModel, table=True):
     """Model for tracking user-flagged cards."""
 
     __tablename__ = "flagged_cards"
-    __table_args__ = (UniqueConstraint("user_id", "card_id", name="uix_user_card_flag"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "card_id", name="uix_user_card_flag"),
+        Index("ix_flagged_cards_user_deck", "user_id", "deck_id"),
+    )
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="users.id", nullable=False, index=True)
+    user_id: int = Field(foreign_key="users.id", nullable=False)
     card_id: int = Field(foreign_key="cards.id", nullable=False, index=True)
     deck_id: int = Field(foreign_key="decks.id", nullable=False, index=True)
     flagged_at: datetime = Field(
@@ -31,8 +39,3 @@ class FlaggedCard(SQLModel, table=True):
     user: "User" = Relationship(back_populates="flagged_cards")
     card: "Card" = Relationship(back_populates="flagged_by_users")
     deck: "Deck" = Relationship(back_populates="flagged_cards")
-
-
-from .card import Card  # noqa: E402
-from .deck import Deck  # noqa: E402
-from .user import User  # noqa: E402
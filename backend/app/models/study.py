@@ -1,11 +1,16 @@
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, Float, Integer, JSON, UniqueConstraint, func
+from sqlalchemy import Boolean, Column, DateTime, Enum, Float, Index, Integer, JSON, UniqueConstraint, func
 from sqlmodel import Field, Relationship, SQLModel
 
 from .enums import QuizMode, QuizStatus
 
+if TYPE_CHECKING:
+    from .card import Card
+    from .deck import Deck
+    from .user import User
+
 quiz_mode_enum = Enum(
     QuizMode,
     name="quiz_mode",
@@ -32,6 +37,9 @@ class UserDeckProgress(SQLModel, table=True):
     last_studied_at: datetime | None = Field(default=None, nullable=True)
     streak: int = Field(default=0)
     pinned: bool = Field(default=False, sa_column=Column(Boolean, nullable=False, server_default='0'))
+    # Answers recorded for this deck across all of the user's sessions; kept
+    # alongside percent_complete so answering doesn't re-count quiz_responses
+    responses_count: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default='0'))
 
     created_at: datetime = Field(
         sa_column=Column(
@@ -96,7 +104,10 @@ class QuizResponse(SQLModel, table=True):
 
 class SRSReview(SQLModel, table=True):
     __tablename__ = "srs_reviews"
-    __table_args__ = (UniqueConstraint("user_id", "card_id", name="uq_review_user_card"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "card_id", name="uq_review_user_card"),
+        Index("ix_srs_reviews_user_due", "user_id", "due_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True, nullable=False)
@@ -115,8 +126,3 @@ class SRSReview(SQLModel, table=True):
 
     user: "User" = Relationship(back_populates="srs_reviews")
     card: "Card" = Relationship(back_populates="srs_reviews")
-
-
-from .card import Card  # noqa: E402
-from .deck import Deck  # noqa: E402
-from .user import User  # noqa: E402
@@ -1,10 +1,13 @@
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from sqlalchemy import Column, String
 from sqlmodel import Field, Relationship, SQLModel
 
 from .deck import DeckTagLink
 
+if TYPE_CHECKING:
+    from .deck import Deck
+
 
 class Tag(SQLModel, table=True):
     __tablename__ = "tags"
@@ -13,7 +16,3 @@ class Tag(SQLModel, table=True):
     name: str = Field(sa_column=Column(String(64), unique=True, nullable=False, index=True))
 
     decks: list["Deck"] = Relationship(back_populates="tags", link_model=DeckTagLink)
-
-
-from .deck import Deck  # noqa: E402
-
@@ -1,11 +1,16 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from sqlalchemy import Column, Date, DateTime, Enum, func
 from sqlmodel import Field, Relationship, SQLModel
 
 from .enums import UserRole
 
+if TYPE_CHECKING:
+    from .deck import Deck
+    from .flagged_card import FlaggedCard
+    from .study import QuizSession, SRSReview, UserDeckProgress
+
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
@@ -14,7 +19,11 @@ class User(SQLModel, table=True):
     email: str = Field(index=True, sa_column_kwargs={"unique": True})
     hashed_password: str = Field(nullable=False)
     full_name: Optional[str] = Field(default=None, nullable=True)
-    role: UserRole = Field(default=UserRole.USER, sa_column=Column(Enum(UserRole, name="user_role")))
+    # Stored as VARCHAR + CHECK rather than a native Postgres enum type
+    role: UserRole = Field(
+        default=UserRole.USER,
+        sa_column=Column(Enum(UserRole, name="user_role", native_enum=False, create_constraint=True, length=16)),
+    )
     is_active: bool = Field(default=True)
 
     # Streak tracking fields
@@ -47,7 +56,3 @@ class User(SQLModel, table=True):
     deck_progresses: list["UserDeckProgress"] = Relationship(back_populates="user")
     srs_reviews: list["SRSReview"] = Relationship(back_populates="user")
     flagged_cards: list["FlaggedCard"] = Relationship(back_populates="user")
-
-
-from .deck import Deck  # noqa: E402  # circular import resolution
-from .study import QuizSession, SRSReview, UserDeckProgress  # noqa: E402
@@ -4,9 +4,10 @@ from .auth import LoginRequest, RefreshRequest, RefreshResponse, SignupRequest,
 from .card import CardCreate, CardRead, CardUpdate
 from .common import IDModelMixin, Message, Paginated, TimestampedModel
 from .deck import DeckCreate, DeckRead, DeckSummary, DeckUpdate, TagRead
-from .flagged_card import FlaggedCardCreate, FlaggedCardDelete, FlaggedCardRead
+from .flagged_card import FlaggedCardBulkCreate, FlaggedCardCreate, FlaggedCardDelete, FlaggedCardRead
 from .study import (
     DueReviewCard,
+    StudyAnswerBulkCreate,
     StudyAnswerCreate,
     StudyAnswerRead,
     StudySessionConfig,
@@ -25,6 +26,7 @@ __all__ = [
     "DeckSummary",
     "DeckUpdate",
     "DueReviewCard",
+    "FlaggedCardBulkCreate",
     "FlaggedCardCreate",
     "FlaggedCardDelete",
     "FlaggedCardRead",
@@ -35,6 +37,7 @@ __all__ = [
     "RefreshRequest",
     "RefreshResponse",
     "SignupRequest",
+    "StudyAnswerBulkCreate",
     "StudyAnswerCreate",
     "StudyAnswerRead",
     "StudySessionConfig",
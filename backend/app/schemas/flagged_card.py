@@ -2,7 +2,9 @@
 
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class FlaggedCardBase(BaseModel):
@@ -18,6 +20,12 @@ class FlaggedCardCreate(FlaggedCardBase):
     pass
 
 
+class FlaggedCardBulkCreate(BaseModel):
+    """Schema for flagging several cards at once."""
+
+    cards: List[FlaggedCardCreate] = Field(..., min_length=1, max_length=500)
+
+
 class FlaggedCardRead(FlaggedCardBase):
     """Schema for reading a flagged card."""
 
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from ..models.enums import QuizMode, QuizStatus
 
@@ -42,6 +42,10 @@ class StudyAnswerCreate(BaseModel):
     quality: Optional[int] = None
 
 
+class StudyAnswerBulkCreate(BaseModel):
+    answers: List[StudyAnswerCreate] = Field(..., min_length=1, max_length=200)
+
+
 class StudyAnswerRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
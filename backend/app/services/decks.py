@@ -2,7 +2,7 @@ from collections.abc import Iterable
 from typing import Tuple
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import selectinload
 from sqlmodel import Session
 
@@ -39,9 +39,11 @@ def create_deck(db: Session, owner: User | None, deck_in: DeckCreate) -> Deck:
     db.flush()
 
     if deck_in.cards:
-        for card_data in deck_in.cards:
-            card = Card(deck_id=deck.id, **card_data.model_dump(exclude_unset=True))
-            db.add(card)
+        # One multi-row INSERT instead of a unit-of-work entry per card
+        db.execute(
+            insert(Card),
+            [{"deck_id": deck.id, **card_data.model_dump()} for card_data in deck_in.cards],
+        )
 
     db.commit()
     db.refresh(deck)
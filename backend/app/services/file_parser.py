@@ -3,29 +3,115 @@ Service for parsing various file formats (PDF, PPT, TXT, DOCX)
 Extracts text content from uploaded files for AI processing.
 """
 
+import asyncio
+import hashlib
 import io
+import mmap
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from typing import Optional
 
 from fastapi import HTTPException, UploadFile
 from loguru import logger
-from PyPDF2 import PdfReader
+from starlette.concurrency import run_in_threadpool
+import pypdfium2 as pdfium
 from pptx import Presentation
 from docx import Document
+from docx.oxml.ns import nsmap, qn
+from lxml import etree
+
+from ..core.cache import TTLCache
+
+# PDF/PPTX/DOCX extraction is CPU-bound Python that holds the GIL, so it runs in
+# worker processes rather than threads
+PARSER_MAX_WORKERS = min(os.cpu_count() or 1, 4)
+
+
+@lru_cache(maxsize=1)
+def _process_pool() -> ProcessPoolExecutor:
+    """Worker processes for document parsing, started on first use."""
+    # spawn, not fork: the server process has running threads by the time
+    # the first upload arrives
+    return ProcessPoolExecutor(
+        max_workers=PARSER_MAX_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+# Extracted text keyed by (extension, blake2b of the upload), so re-uploading
+# the same file skips parsing. Very large extractions are not cached.
+PARSE_CACHE_TTL_SECONDS = 60 * 60
+PARSE_CACHE_MAX_CHARS = 1_000_000
+_parsed_text_cache: TTLCache[tuple[str, bytes, Optional[int]], str] = TTLCache(maxsize=32, ttl=PARSE_CACHE_TTL_SECONDS)
+
+
+def shutdown_process_pool() -> None:
+    """Stop the parser worker processes, if any were started. Called on app shutdown."""
+    if _process_pool.cache_info().currsize:
+        _process_pool().shutdown(wait=False, cancel_futures=True)
+        _process_pool.cache_clear()
+
+
+# Leading bytes every supported binary format starts with. PPTX and DOCX are
+# ZIP containers; legacy OLE .ppt files can't be read by python-pptx anyway.
+_FILE_SIGNATURES = {
+    ".pdf": b"%PDF-",
+    ".ppt": b"PK\x03\x04",
+    ".pptx": b"PK\x03\x04",
+    ".docx": b"PK\x03\x04",
+}
+
+
+# python-docx builds Paragraph/Run proxies and calls str() on every run child to
+# produce paragraph.text; walking the run content with one compiled XPath is an
+# order of magnitude faster and maps the same elements to the same text
+_DOCX_PARAGRAPHS = etree.XPath("w:body/w:p", namespaces=nsmap)
+_DOCX_RUN_CONTENT = etree.XPath("w:r/* | w:hyperlink/w:r/*", namespaces=nsmap)
+_DOCX_TEXT, _DOCX_BREAK = qn("w:t"), qn("w:br")
+_DOCX_BREAK_TYPE = qn("w:type")
+_DOCX_CHAR_ELEMENTS = {
+    qn("w:tab"): "\t",
+    qn("w:ptab"): "\t",
+    qn("w:cr"): "\n",
+    qn("w:noBreakHyphen"): "-",
+}
+
+
+def _docx_paragraph_text(paragraph: etree._Element) -> str:
+    """Same text as python-docx's Paragraph.text, read straight from the XML."""
+    parts = []
+    for element in _DOCX_RUN_CONTENT(paragraph):
+        tag = element.tag
+        if tag == _DOCX_TEXT:
+            parts.append(element.text or "")
+        elif tag == _DOCX_BREAK:
+            # Line breaks become newlines; page and column breaks add nothing
+            if element.get(_DOCX_BREAK_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        else:
+            parts.append(_DOCX_CHAR_ELEMENTS.get(tag, ""))
+    return "".join(parts)
 
 
 class FileParserService:
     """Service for parsing various file formats"""
 
-    SUPPORTED_EXTENSIONS = {".pdf", ".ppt", ".pptx", ".txt", ".docx"}
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+    READ_CHUNK_SIZE = 1024 * 1024  # Copy uploads to disk 1 MB at a time
 
     @staticmethod
-    async def parse_file(file: UploadFile) -> str:
+    async def parse_file(file: UploadFile, max_chars: Optional[int] = None) -> str:
         """
         Parse uploaded file and extract text content.
 
         Args:
             file: Uploaded file object
+            max_chars: Stop extracting PDF/PPT/DOCX text at the first page, slide or
+                paragraph boundary past this many characters (None for everything)
 
         Returns:
             Extracted text content
@@ -41,35 +127,57 @@ class FileParserService:
                 detail=f"Unsupported file format. Supported formats: {', '.join(FileParserService.SUPPORTED_EXTENSIONS)}"
             )
 
-        # Read file content
+        # Starlette records the size of the spooled upload, so oversized files
+        # can be rejected before copying a single chunk
+        if file.size is not None and file.size > FileParserService.MAX_FILE_SIZE:
+            raise FileParserService._file_too_large()
+
         try:
-            content = await file.read()
-            file_size = len(content)
-
-            # Validate file size
-            if file_size > FileParserService.MAX_FILE_SIZE:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"File too large. Maximum size: {FileParserService.MAX_FILE_SIZE / (1024 * 1024)} MB"
-                )
-
-            # Parse based on file type
-            if file_ext == ".pdf":
-                return FileParserService._parse_pdf(content)
-            elif file_ext in {".ppt", ".pptx"}:
-                return FileParserService._parse_pptx(content)
-            elif file_ext == ".txt":
-                return FileParserService._parse_txt(content)
-            elif file_ext == ".docx":
-                return FileParserService._parse_docx(content)
-            else:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Unsupported file format"
-                )
+            # Copy the upload to a temp file in chunks so the whole file is never
+            # held in memory; the parsers read it back from disk
+            with tempfile.NamedTemporaryFile(suffix=file_ext) as tmp:
+                file_size = 0
+                digest = hashlib.blake2b(digest_size=16)
+                while chunk := await file.read(FileParserService.READ_CHUNK_SIZE):
+                    if not file_size:
+                        FileParserService._check_signature(file_ext, chunk)
+                    file_size += len(chunk)
+
+                    # Validate file size
+                    if file_size > FileParserService.MAX_FILE_SIZE:
+                        raise FileParserService._file_too_large()
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                tmp.flush()
+
+                cache_key = (file_ext, digest.digest(), max_chars)
+                text = _parsed_text_cache.get(cache_key)
+                if text is not None:
+                    return text
+
+                # Decoding text is cheap, so only documents go to the process pool
+                if file_ext == ".txt":
+                    text = await run_in_threadpool(FileParserService._parse_txt, tmp.name)
+                else:
+                    loop = asyncio.get_running_loop()
+                    text = await loop.run_in_executor(
+                        _process_pool(), FileParserService._parse_path, tmp.name, file_ext, max_chars
+                    )
+
+                if len(text) <= PARSE_CACHE_MAX_CHARS:
+                    _parsed_text_cache.set(cache_key, text)
+                return text
 
         except HTTPException:
             raise
+        except BrokenProcessPool:
+            # A worker died mid-parse (e.g. crashed on a malformed file); replace the pool
+            logger.error(f"Parser worker crashed while parsing {file.filename}")
+            shutdown_process_pool()
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to parse file: the parser crashed on this file"
+            )
         except Exception as e:
             logger.error(f"Error parsing file {file.filename}: {str(e)}")
             raise HTTPException(
@@ -77,113 +185,189 @@ class FileParserService:
                 detail=f"Failed to parse file: {str(e)}"
             )
 
+    @staticmethod
+    def _parse_path(path: str, file_ext: str, max_chars: Optional[int] = None) -> str:
+        """Parse a file on disk based on file type"""
+        parser = FileParserService._PARSERS.get(file_ext)
+        if parser is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Unsupported file format"
+            )
+        return parser(path, max_chars)
+
+    @staticmethod
+    def _check_signature(file_ext: str, head: bytes) -> None:
+        """Reject uploads whose leading bytes don't match their extension"""
+        magic = _FILE_SIGNATURES.get(file_ext)
+        if magic is not None:
+            matches = head.startswith(magic)
+        else:
+            # Text files must not contain NUL bytes near the start
+            matches = b"\0" not in head[:512]
+        if not matches:
+            raise HTTPException(status_code=400, detail="File contents do not match extension")
+
+    @staticmethod
+    def _file_too_large() -> HTTPException:
+        return HTTPException(
+            status_code=400,
+            detail=f"File too large. Maximum size: {FileParserService.MAX_FILE_SIZE / (1024 * 1024)} MB"
+        )
+
     @staticmethod
     def _get_file_extension(filename: Optional[str]) -> str:
         """Extract file extension from filename"""
         if not filename:
             raise HTTPException(status_code=400, detail="Filename is required")
 
-        if "." not in filename:
+        file_ext = os.path.splitext(filename)[1]
+        if not file_ext:
             raise HTTPException(status_code=400, detail="File must have an extension")
 
-        return "." + filename.rsplit(".", 1)[1].lower()
+        return file_ext.lower()
 
     @staticmethod
-    def _parse_pdf(content: bytes) -> str:
+    def _parse_pdf(path: str, max_chars: Optional[int] = None) -> str:
         """Parse PDF file and extract text"""
         try:
-            pdf_file = io.BytesIO(content)
-            pdf_reader = PdfReader(pdf_file)
-
-            text_content = []
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                try:
-                    text = page.extract_text()
-                    if text.strip():
-                        text_content.append(f"--- Page {page_num} ---\n{text}")
-                except Exception as e:
-                    logger.warning(f"Could not extract text from page {page_num}: {str(e)}")
-                    continue
-
-            if not text_content:
+            pdf = pdfium.PdfDocument(path)
+            buf = io.StringIO()
+            try:
+                for page_num, page in enumerate(pdf, 1):
+                    try:
+                        textpage = page.get_textpage()
+                        # PDFium separates lines with CRLF
+                        text = textpage.get_text_range().replace("\r\n", "\n")
+                        textpage.close()
+                        if text.strip():
+                            if buf.tell():
+                                buf.write("\n\n")
+                            buf.write("--- Page ")
+                            buf.write(str(page_num))
+                            buf.write(" ---\n")
+                            buf.write(text)
+                    except Exception as e:
+                        logger.warning(f"Could not extract text from page {page_num}: {str(e)}")
+                        continue
+                    finally:
+                        page.close()
+                    if max_chars is not None and buf.tell() > max_chars:
+                        break
+            finally:
+                pdf.close()
+
+            if not buf.tell():
                 raise ValueError("No text content could be extracted from PDF")
 
-            return "\n\n".join(text_content)
+            return buf.getvalue()
 
         except Exception as e:
             logger.error(f"Error parsing PDF: {str(e)}")
             raise ValueError(f"Failed to parse PDF: {str(e)}")
 
     @staticmethod
-    def _parse_pptx(content: bytes) -> str:
+    def _parse_pptx(path: str, max_chars: Optional[int] = None) -> str:
         """Parse PowerPoint file and extract text"""
         try:
-            pptx_file = io.BytesIO(content)
-            presentation = Presentation(pptx_file)
+            presentation = Presentation(path)
 
-            text_content = []
+            buf = io.StringIO()
             for slide_num, slide in enumerate(presentation.slides, 1):
-                slide_text = []
+                has_text = False
 
                 # Extract text from all shapes in the slide
                 for shape in slide.shapes:
-                    if hasattr(shape, "text") and shape.text.strip():
-                        slide_text.append(shape.text)
-
-                if slide_text:
-                    text_content.append(
-                        f"--- Slide {slide_num} ---\n{chr(10).join(slide_text)}"
-                    )
-
-            if not text_content:
+                    if not shape.has_text_frame:
+                        continue
+                    # text_frame.text is rebuilt from the XML on every access; read it once
+                    text = shape.text_frame.text
+                    if not text or text.isspace():
+                        continue
+                    if has_text:
+                        buf.write("\n")
+                    else:
+                        if buf.tell():
+                            buf.write("\n\n")
+                        buf.write("--- Slide ")
+                        buf.write(str(slide_num))
+                        buf.write(" ---\n")
+                        has_text = True
+                    buf.write(text)
+
+                if max_chars is not None and buf.tell() > max_chars:
+                    break
+
+            if not buf.tell():
                 raise ValueError("No text content could be extracted from PowerPoint")
 
-            return "\n\n".join(text_content)
+            return buf.getvalue()
 
         except Exception as e:
             logger.error(f"Error parsing PowerPoint: {str(e)}")
             raise ValueError(f"Failed to parse PowerPoint: {str(e)}")
 
     @staticmethod
-    def _parse_txt(content: bytes) -> str:
-        """Parse text file"""
+    def _parse_txt(path: str, max_chars: Optional[int] = None) -> str:
+        """Parse text file (decoding is a single cheap pass, so max_chars is not applied)"""
         try:
-            # Try UTF-8 first, fall back to latin-1
-            try:
-                text = content.decode("utf-8")
-            except UnicodeDecodeError:
-                text = content.decode("latin-1")
-
-            if not text.strip():
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    raise ValueError("Text file is empty")
+
+                # Decode straight from the mapped file instead of reading it into bytes first
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    # Try UTF-8 first, fall back to latin-1
+                    try:
+                        text = str(content, "utf-8")
+                    except UnicodeDecodeError:
+                        text = str(content, "latin-1")
+
+            text = text.strip()
+            if not text:
                 raise ValueError("Text file is empty")
 
-            return text.strip()
+            return text
 
         except Exception as e:
             logger.error(f"Error parsing text file: {str(e)}")
             raise ValueError(f"Failed to parse text file: {str(e)}")
 
     @staticmethod
-    def _parse_docx(content: bytes) -> str:
+    def _parse_docx(path: str, max_chars: Optional[int] = None) -> str:
         """Parse Word document and extract text"""
         try:
-            docx_file = io.BytesIO(content)
-            document = Document(docx_file)
-
-            text_content = []
-            for para_num, paragraph in enumerate(document.paragraphs, 1):
-                if paragraph.text.strip():
-                    text_content.append(paragraph.text)
-
-            if not text_content:
+            document = Document(path)
+
+            buf = io.StringIO()
+            for paragraph in _DOCX_PARAGRAPHS(document.element):
+                text = _docx_paragraph_text(paragraph)
+                if text and not text.isspace():
+                    if buf.tell():
+                        buf.write("\n\n")
+                    buf.write(text)
+                    if max_chars is not None and buf.tell() > max_chars:
+                        break
+
+            if not buf.tell():
                 raise ValueError("No text content could be extracted from Word document")
 
-            return "\n\n".join(text_content)
+            return buf.getvalue()
 
         except Exception as e:
             logger.error(f"Error parsing Word document: {str(e)}")
             raise ValueError(f"Failed to parse Word document: {str(e)}")
 
+    # Extension -> parser, resolved once when the class is built
+    _PARSERS = {
+        ".pdf": _parse_pdf,
+        ".ppt": _parse_pptx,
+        ".pptx": _parse_pptx,
+        ".txt": _parse_txt,
+        ".docx": _parse_docx,
+    }
+    SUPPORTED_EXTENSIONS = frozenset(_PARSERS)
+
 
 # Singleton instance
 file_parser_service = FileParserService()
@@ -1,16 +1,43 @@
 """Service for managing flagged cards."""
 
-from datetime import datetime, timezone
 from typing import List
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import bindparam, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlmodel import Session
 
 from ..models import Card, Deck, FlaggedCard, User
 from ..schemas.card import CardRead
 from ..schemas.flagged_card import FlaggedCardCreate, FlaggedCardRead
 
+# Hot-path statements are built once with bound parameters so each call only
+# supplies values instead of rebuilding (and re-keying) the expression tree
+_user_card = (
+    FlaggedCard.user_id == bindparam("user_id"),
+    FlaggedCard.card_id == bindparam("card_id"),
+)
+_user_deck = (
+    FlaggedCard.user_id == bindparam("user_id"),
+    FlaggedCard.deck_id == bindparam("deck_id"),
+)
+_FLAG_ROWS = select(*FlaggedCard.__table__.c).where(
+    FlaggedCard.user_id == bindparam("user_id"),
+    FlaggedCard.card_id.in_(bindparam("card_ids", expanding=True)),
+)
+_CARD_DECKS = select(Card.id, Card.deck_id).where(
+    Card.id.in_(bindparam("card_ids", expanding=True))
+)
+_FLAG_EXISTS = select(literal(1)).where(*_user_card).limit(1)
+_FLAGGED_CARDS_IN_DECK = (
+    select(Card)
+    .join(FlaggedCard, FlaggedCard.card_id == Card.id)
+    .where(*_user_deck)
+)
+_FLAGGED_CARD_IDS_IN_DECK = select(FlaggedCard.card_id).where(*_user_deck)
+_COUNT_FLAGGED_IN_DECK = select(func.count()).select_from(FlaggedCard).where(*_user_deck)
+
 
 def flag_card(db: Session, user: User, payload: FlaggedCardCreate) -> FlaggedCardRead:
     """
@@ -27,56 +54,69 @@ def flag_card(db: Session, user: User, payload: FlaggedCardCreate) -> FlaggedCar
     Raises:
         HTTPException: If card doesn't exist or is already flagged
     """
-    # Verify card exists and belongs to the specified deck
-    card = db.get(Card, payload.card_id)
-    if not card:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Card not found"
-        )
+    return flag_cards_bulk(db, user, [payload])[0]
 
-    if card.deck_id != payload.deck_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Card does not belong to the specified deck"
-        )
 
-    # Check if already flagged using scalars to get model objects
-    stmt = select(FlaggedCard).where(
-        FlaggedCard.user_id == user.id,
-        FlaggedCard.card_id == payload.card_id
-    )
-    existing = db.scalars(stmt).first()
-
-    if existing:
-        # Return existing flag instead of raising error
-        return FlaggedCardRead(
-            id=existing.id,
-            user_id=existing.user_id,
-            card_id=existing.card_id,
-            deck_id=existing.deck_id,
-            flagged_at=existing.flagged_at
-        )
+def flag_cards_bulk(
+    db: Session, user: User, payloads: List[FlaggedCardCreate]
+) -> List[FlaggedCardRead]:
+    """
+    Flag several cards for the current user in one statement.
 
-    # Create new flagged card
-    flagged = FlaggedCard(
-        user_id=user.id,
-        card_id=payload.card_id,
-        deck_id=payload.deck_id,
-        flagged_at=datetime.now(tz=timezone.utc)
-    )
+    Args:
+        db: Database session
+        user: Current user
+        payloads: Flag card requests with card_id and deck_id
 
-    db.add(flagged)
-    db.commit()
-    db.refresh(flagged)
-
-    return FlaggedCardRead(
-        id=flagged.id,
-        user_id=flagged.user_id,
-        card_id=flagged.card_id,
-        deck_id=flagged.deck_id,
-        flagged_at=flagged.flagged_at
+    Returns:
+        One flagged card record per distinct card, in request order. Cards
+        that were already flagged return their existing flag.
+
+    Raises:
+        HTTPException: If a card doesn't exist or doesn't belong to its deck
+    """
+    # Repeated card ids collapse to a single flag
+    requested = {payload.card_id: payload.deck_id for payload in payloads}
+
+    # Verify every card exists and belongs to the specified deck
+    card_decks = dict(db.execute(_CARD_DECKS, {"card_ids": list(requested)}).all())
+    for card_id, deck_id in requested.items():
+        if card_id not in card_decks:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Card not found"
+            )
+        if card_decks[card_id] != deck_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Card does not belong to the specified deck"
+            )
+
+    # Insert all flags and read them back in one statement; existing flags for
+    # (user_id, card_id) hit uix_user_card_flag and return no row instead.
+    # flagged_at comes from the column's server default.
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = (
+        insert(FlaggedCard)
+        .values([
+            {"user_id": user.id, "card_id": card_id, "deck_id": deck_id}
+            for card_id, deck_id in requested.items()
+        ])
+        .on_conflict_do_nothing(index_elements=["user_id", "card_id"])
+        .returning(*FlaggedCard.__table__.c)
     )
+    rows = {row["card_id"]: row for row in db.execute(stmt).mappings()}
+    db.commit()
+
+    already_flagged = [card_id for card_id in requested if card_id not in rows]
+    if already_flagged:
+        # Return existing flags instead of raising error
+        existing = db.execute(
+            _FLAG_ROWS, {"user_id": user.id, "card_ids": already_flagged}
+        ).mappings()
+        rows.update((row["card_id"], row) for row in existing)
+
+    return [FlaggedCardRead.model_validate(dict(rows[card_id])) for card_id in requested]
 
 
 def unflag_card(db: Session, user: User, card_id: int) -> None:
@@ -91,19 +131,20 @@ def unflag_card(db: Session, user: User, card_id: int) -> None:
     Raises:
         HTTPException: If card is not flagged
     """
-    stmt = select(FlaggedCard).where(
-        FlaggedCard.user_id == user.id,
-        FlaggedCard.card_id == card_id
+    # Delete in a single statement; no matching row means the card wasn't flagged
+    result = db.execute(
+        delete(FlaggedCard).where(
+            FlaggedCard.user_id == user.id,
+            FlaggedCard.card_id == card_id
+        )
     )
-    flagged = db.scalars(stmt).first()
 
-    if not flagged:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Card is not flagged"
         )
 
-    db.delete(flagged)
     db.commit()
 
 
@@ -127,23 +168,9 @@ def get_flagged_cards_for_deck(db: Session, user: User, deck_id: int) -> List[Ca
             detail="Deck not found"
         )
 
-    # Get flagged cards for this deck and user
-    flagged_cards = db.scalars(
-        select(FlaggedCard).where(
-            FlaggedCard.user_id == user.id,
-            FlaggedCard.deck_id == deck_id
-        )
-    ).all()
-
-    # Get card IDs
-    card_ids = [fc.card_id for fc in flagged_cards]
-
-    if not card_ids:
-        return []
-
-    # Fetch full card details using scalars to get Card objects
+    # Load the flagged cards in one round-trip by joining through flagged_cards
     cards = db.scalars(
-        select(Card).where(Card.id.in_(card_ids))
+        _FLAGGED_CARDS_IN_DECK, {"user_id": user.id, "deck_id": deck_id}
     ).all()
 
     return [CardRead.model_validate(card) for card in cards]
@@ -161,16 +188,27 @@ def get_flagged_card_ids_for_deck(db: Session, user: User, deck_id: int) -> List
     Returns:
         List of card IDs that are flagged
     """
-    # Select entire FlaggedCard object to avoid tuple results
-    flagged_cards = db.scalars(
-        select(FlaggedCard).where(
-            FlaggedCard.user_id == user.id,
-            FlaggedCard.deck_id == deck_id
-        )
-    ).all()
+    # Project just the card_id column rather than loading FlaggedCard objects
+    return list(db.scalars(
+        _FLAGGED_CARD_IDS_IN_DECK, {"user_id": user.id, "deck_id": deck_id}
+    ).all())
 
-    # Extract card_id from each FlaggedCard object
-    return [fc.card_id for fc in flagged_cards]
+
+def count_flagged_for_deck(db: Session, user: User, deck_id: int) -> int:
+    """
+    Count flagged cards for a specific deck and user.
+
+    Args:
+        db: Database session
+        user: Current user
+        deck_id: ID of the deck
+
+    Returns:
+        Number of cards the user has flagged in the deck
+    """
+    return db.scalar(
+        _COUNT_FLAGGED_IN_DECK, {"user_id": user.id, "deck_id": deck_id}
+    )
 
 
 def get_flagged_cards_count_by_deck(db: Session, user: User) -> dict[int, int]:
@@ -184,12 +222,10 @@ def get_flagged_cards_count_by_deck(db: Session, user: User) -> dict[int, int]:
     Returns:
         Dictionary mapping deck_id to count of flagged cards
     """
-    from sqlalchemy import func as sql_func
-
     results = db.exec(
         select(
             FlaggedCard.deck_id,
-            sql_func.count(FlaggedCard.id).label("count")
+            func.count(FlaggedCard.id).label("count")
         )
         .where(FlaggedCard.user_id == user.id)
         .group_by(FlaggedCard.deck_id)
@@ -210,10 +246,6 @@ def is_card_flagged(db: Session, user: User, card_id: int) -> bool:
     Returns:
         True if card is flagged, False otherwise
     """
-    stmt = select(FlaggedCard).where(
-        FlaggedCard.user_id == user.id,
-        FlaggedCard.card_id == card_id
-    )
-    flagged = db.scalars(stmt).first()
-
-    return flagged is not None
+    return db.scalar(
+        _FLAG_EXISTS, {"user_id": user.id, "card_id": card_id}
+    ) is not None
@@ -3,16 +3,355 @@ LLM Service for AI-powered flashcard generation.
 Supports both OpenAI and Ollama providers with agentic AI patterns.
 """
 
-import json
-from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import math
+import random
+import re
+import weakref
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException
 from loguru import logger
 from openai import AsyncOpenAI, OpenAIError
 import httpx
+import orjson
+from pydantic import TypeAdapter, ValidationError
+from typing_extensions import TypedDict
 
+from ..core.cache import TTLCache
+from ..core.rate_limit import TokenBucket
+from ..models.enums import CardType
 from ..models.user import User
 
+# Ollama availability is probed on status polls and before every generation;
+# remember the answer briefly so bursts of calls share one probe.
+OLLAMA_STATUS_TTL_SECONDS = 5
+_ollama_status_cache: TTLCache[str, bool] = TTLCache(maxsize=1, ttl=OLLAMA_STATUS_TTL_SECONDS)
+
+# Validated LLM results, keyed by a hash of the provider, model and full input.
+# Generation runs at a non-zero temperature, so its results are only reused for
+# a short window (retries, double submits); answer checks are kept longer since
+# the same answers come up again and again on a fixed deck. Generated cards are
+# stored serialized so every hit gets its own copy, nested options included.
+GENERATION_CACHE_TTL_SECONDS = 10 * 60
+ANSWER_CHECK_CACHE_TTL_SECONDS = 60 * 60
+_generation_cache: TTLCache[str, bytes] = TTLCache(maxsize=256, ttl=GENERATION_CACHE_TTL_SECONDS)
+_answer_check_cache: TTLCache[str, Dict[str, Any]] = TTLCache(maxsize=1024, ttl=ANSWER_CHECK_CACHE_TTL_SECONDS)
+
+# Per-user limits on LLM work, checked before any prompt is built or provider
+# slot is taken. Cache hits are free. Generation over the limit is rejected
+# with 429; answer checks over it fall back to exact matching.
+GENERATION_RATE_LIMIT = 20
+GENERATION_RATE_PERIOD_SECONDS = 60 * 60
+ANSWER_CHECK_RATE_LIMIT = 60
+ANSWER_CHECK_RATE_PERIOD_SECONDS = 60
+_generation_limiter: TokenBucket[int] = TokenBucket(GENERATION_RATE_LIMIT, GENERATION_RATE_PERIOD_SECONDS)
+_answer_check_limiter: TokenBucket[int] = TokenBucket(ANSWER_CHECK_RATE_LIMIT, ANSWER_CHECK_RATE_PERIOD_SECONDS)
+
+
+def _cache_key(*parts: Any) -> str:
+    """Hash the parts of an LLM request into a fixed-size cache key."""
+    return hashlib.sha256("\x1f".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+
+def _answer_variant_key(answer: str) -> str:
+    """
+    Fold away differences in case, spacing and trailing punctuation so that
+    trivially different submissions of the same answer share one cache entry.
+    Anything beyond that (typos, paraphrases) still goes to the LLM: answers a
+    word apart can have opposite verdicts ("increases" vs "decreases").
+    """
+    return " ".join(answer.casefold().split()).rstrip(".!?;, ")
+
+
+# Ollama request bodies are serialized with orjson and sent as raw content
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+# Transient failures are retried below the service rather than surfacing as an
+# error the user answers by clicking again. The OpenAI SDK retries 408/409/429,
+# 5xx, timeouts and connection errors with jittered exponential backoff
+# (0.5s initial, 8s cap); OPENAI_MAX_RETRIES only pins its default of 2 so the
+# budget is visible here. Ollama calls retry 429, 5xx and timeouts the same
+# way (see _OllamaRetry), as long as no part of a streamed reply has been
+# consumed yet; failed connection attempts are retried by the transport.
+OPENAI_MAX_RETRIES = 2
+OLLAMA_MAX_RETRIES = 2
+OLLAMA_CONNECT_RETRIES = 2
+OLLAMA_RETRY_INITIAL_DELAY = 0.5
+OLLAMA_RETRY_MAX_DELAY = 8.0
+
+
+def _should_retry_ollama(status_code: int) -> bool:
+    """Return True for Ollama responses worth retrying (rate limited or server errors)"""
+    return status_code == 429 or status_code >= 500
+
+
+def _ollama_retry_delay(attempt: int) -> float:
+    """Jittered exponential backoff before retrying after failed attempt number ``attempt``"""
+    delay = min(OLLAMA_RETRY_MAX_DELAY, OLLAMA_RETRY_INITIAL_DELAY * 2 ** attempt)
+    return delay * (1 - 0.25 * random.random())
+
+
+class _OllamaRetry:
+    """
+    Retry budget for one Ollama call, shared by the streamed and plain requests.
+
+    Generation passes retry_read_timeouts=False: a read timeout there means the
+    model already ran for OLLAMA_GENERATION_TIMEOUT, and retrying would stretch
+    one request to several times that.
+    """
+
+    def __init__(self, retry_read_timeouts: bool = True) -> None:
+        self.attempt = 0
+        self.retry_read_timeouts = retry_read_timeouts
+
+    async def should_retry(
+        self,
+        status_code: Optional[int] = None,
+        timeout: Optional[httpx.TimeoutException] = None,
+        started: bool = False,
+    ) -> bool:
+        """
+        Decide whether to retry after a non-200 ``status_code`` or a ``timeout``,
+        sleeping for the backoff delay first if so. Nothing is retried once
+        ``started``, i.e. part of a streamed reply has been consumed.
+        """
+        if started or self.attempt >= OLLAMA_MAX_RETRIES:
+            return False
+        if timeout is not None:
+            if isinstance(timeout, httpx.ReadTimeout) and not self.retry_read_timeouts:
+                return False
+            logger.warning("Ollama request timed out, retrying")
+        elif status_code is not None and _should_retry_ollama(status_code):
+            logger.warning("Ollama returned {}, retrying", status_code)
+        else:
+            return False
+        await asyncio.sleep(_ollama_retry_delay(self.attempt))
+        self.attempt += 1
+        return True
+
+
+@lru_cache(maxsize=1)
+def _http_client() -> httpx.AsyncClient:
+    """
+    Shared HTTP client for Ollama calls.
+
+    Reusing one client keeps connections alive between requests instead of
+    opening a new one per call. Each request passes its own timeout. Ollama
+    only speaks plain HTTP/1.1, so idle connections are instead kept for a
+    minute to span the gaps between a user's status check, generation and
+    answer checks.
+    """
+    limits = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60.0)
+    return httpx.AsyncClient(
+        timeout=60.0,
+        limits=limits,
+        # Retry failed connection attempts (e.g. while Ollama restarts) with
+        # exponential backoff; requests that reached the server are not resent
+        transport=httpx.AsyncHTTPTransport(limits=limits, retries=OLLAMA_CONNECT_RETRIES),
+    )
+
+
+# Upper bound on OpenAI requests in flight from this process. Batched generation
+# fans one request out into several calls; the cap keeps bursts of users from
+# tripping the account's rate limit all at once.
+OPENAI_MAX_CONCURRENT_REQUESTS = 16
+
+
+# An asyncio.Semaphore binds to the loop that first waits on it, so each event
+# loop gets its own; entries go away with their loop.
+_openai_slots_by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _openai_slots() -> asyncio.Semaphore:
+    """Semaphore bounding concurrent OpenAI requests on the running event loop."""
+    loop = asyncio.get_running_loop()
+    slots = _openai_slots_by_loop.get(loop)
+    if slots is None:
+        slots = _openai_slots_by_loop[loop] = asyncio.Semaphore(OPENAI_MAX_CONCURRENT_REQUESTS)
+    return slots
+
+
+@lru_cache(maxsize=1)
+def _openai_http_client() -> httpx.AsyncClient:
+    """
+    Connection pool shared by every OpenAI client.
+
+    All users' keys talk to the same host, so one pool lets a request reuse a
+    warm TLS connection regardless of whose key it carries. The API negotiates
+    HTTP/2, so concurrent batch requests multiplex over that connection.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(600.0, connect=5.0),
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=20),
+        follow_redirects=True,
+    )
+
+
+@lru_cache(maxsize=32)
+def _openai_client(api_key: str) -> AsyncOpenAI:
+    """OpenAI client for an API key, reused across calls with the same key."""
+    return AsyncOpenAI(api_key=api_key, http_client=_openai_http_client(), max_retries=OPENAI_MAX_RETRIES)
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP clients, if any were created. Called on app shutdown."""
+    if _http_client.cache_info().currsize:
+        await _http_client().aclose()
+        _http_client.cache_clear()
+    _openai_client.cache_clear()
+    if _openai_http_client.cache_info().currsize:
+        await _openai_http_client().aclose()
+        _openai_http_client.cache_clear()
+
+
+@lru_cache(maxsize=4)
+def _min_content_pattern(min_length: int) -> "re.Pattern[str]":
+    """Match a span of at least min_length characters that starts and ends on non-whitespace"""
+    return re.compile(rf"\S[\s\S]{{{min_length - 2},}}?\S")
+
+
+# Card types a generated card may declare; anything else falls back to "basic"
+_CARD_TYPES = frozenset(card_type.value for card_type in CardType)
+
+# Type-specific fields copied onto a validated card, keyed by card type:
+# (field name, usability check given the field and the card, reason logged
+# when a card is dropped). Option lists are a handful of entries, so a plain
+# list scan is the cheapest membership check.
+_TYPE_SPECIFIC_FIELDS: Dict[str, Tuple[str, Callable[[Any, Dict[str, Any]], bool], str]] = {
+    "multiple_choice": (
+        "options",
+        lambda options, card: isinstance(options, list) and len(options) >= 2 and card["answer"] in options,
+        "needs at least 2 options including the answer",
+    ),
+    "cloze": (
+        "cloze_data",
+        lambda cloze_data, card: bool(cloze_data) and "blanks" in cloze_data,
+        "missing cloze_data",
+    ),
+}
+
+
+# OpenAI generation replies through a forced function call rather than free-form
+# JSON text: the schema is enforced server-side and the tool spec is part of the
+# static, cacheable request prefix. The arguments have the same {"cards": [...]}
+# shape as the JSON-mode reply Ollama produces, so both share one parser.
+_SUBMIT_FLASHCARDS_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "submit_flashcards",
+        "description": "Submit the generated flashcards.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "cards": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "type": {"type": "string", "enum": [card_type.value for card_type in CardType]},
+                            "prompt": {"type": "string"},
+                            "answer": {"type": "string"},
+                            "explanation": {"type": ["string", "null"]},
+                            "options": {"type": "array", "items": {"type": "string"}},
+                            "cloze_data": {
+                                "type": "object",
+                                "properties": {
+                                    "blanks": {
+                                        "type": "array",
+                                        "items": {
+                                            "type": "object",
+                                            "properties": {
+                                                "answer": {"type": "string"},
+                                                "position": {"type": "integer"},
+                                            },
+                                        },
+                                    },
+                                },
+                            },
+                        },
+                        "required": ["type", "prompt", "answer"],
+                    },
+                },
+            },
+            "required": ["cards"],
+        },
+    },
+}
+_SUBMIT_FLASHCARDS_CHOICE = {"type": "function", "function": {"name": "submit_flashcards"}}
+
+
+class _GeneratedCards(TypedDict):
+    """Envelope of a generation reply; cards are normalized one at a time afterwards"""
+
+    cards: List[Any]
+
+
+# Decodes a reply and checks its envelope in a single pass inside pydantic-core
+_generated_cards_adapter = TypeAdapter(_GeneratedCards)
+
+
+class _CardStreamParser:
+    """
+    Incrementally pull complete card objects out of a streamed JSON response.
+
+    The model emits ``{"cards": [{...}, {...}]}`` a few tokens at a time. Each
+    object that closes at the depth of the ``cards`` array is decoded and
+    returned as soon as its closing brace arrives.
+    """
+
+    CARD_DEPTH = 2
+
+    def __init__(self) -> None:
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._current: Optional[List[str]] = None
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        cards = []
+        for ch in text:
+            if self._in_string:
+                if self._current is not None:
+                    self._current.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if ch == "{" and self._depth == self.CARD_DEPTH and self._current is None:
+                    self._current = []
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+
+            if self._current is None:
+                continue
+            self._current.append(ch)
+            if self._depth == self.CARD_DEPTH:
+                raw = "".join(self._current)
+                self._current = None
+                try:
+                    card = orjson.loads(raw)
+                except orjson.JSONDecodeError:
+                    logger.warning(f"Skipping malformed card in LLM stream: {raw[:200]}")
+                    continue
+                if isinstance(card, dict):
+                    cards.append(card)
+        return cards
+
 
 class LLMService:
     """Service for generating flashcards using LLMs"""
@@ -25,12 +364,60 @@ class LLMService:
     # Generation parameters
     TEMPERATURE = 0.7
     MAX_TOKENS = 4000
+    MIN_CONTENT_LENGTH = 50  # Minimum characters of content, ignoring surrounding whitespace
     MAX_CONTENT_LENGTH = 10000  # Maximum characters of content to send to LLM
+    OLLAMA_GENERATION_TIMEOUT = 300.0  # 5 minutes for complex prompts
+    # Ollama's default context window (2-8k tokens depending on version) is smaller
+    # than a full-length generation request, and it drops the start of an
+    # overlong prompt (the system prompt) without an error. Size it for the worst
+    # case instead: MAX_CONTENT_LENGTH characters at about one token each, plus
+    # the system prompt and MAX_TOKENS of reply. A fixed value keeps Ollama from
+    # reloading the model whenever the requested context size changes.
+    OLLAMA_NUM_CTX = 16384
+
+    # Batching: large requests are split into several smaller prompts sent
+    # concurrently. Ollama only serves them in parallel when started with
+    # OLLAMA_NUM_PARALLEL > 1; otherwise it queues them.
+    CARDS_PER_REQUEST = 4
+    MIN_PASSAGE_LENGTH = 1000  # Don't split content into passages shorter than this
+    PASSAGE_OVERLAP = 200  # Characters shared between neighbouring passages
+
+    # Per-request prompts, filled in with str.format. Everything static lives in
+    # the system prompts and the varying input comes last, so consecutive
+    # requests share the longest possible prefix for provider-side prompt caching
+    USER_PROMPT_TEMPLATE = """Generate exactly {num_cards} high-quality flashcards covering the most important concepts from the content below.
+Respond with ONLY the JSON object, no additional text.
 
-    @staticmethod
-    def _create_system_prompt() -> str:
-        """Create the system prompt for flashcard generation"""
-        return """You are an expert educational content creator specializing in creating high-quality flashcards.
+Content:
+{content}"""
+    ANSWER_CHECK_PROMPT_TEMPLATE = """Question: {question}
+Expected Answer: {expected_answer}
+Student's Answer: {user_answer}"""
+
+    # Fixed system messages for answer checking and card generation. These must
+    # stay byte-identical between requests: never interpolate per-call values
+    ANSWER_CHECK_SYSTEM_PROMPT = """You are an expert educator tasked with evaluating student answers.
+
+You will be given a question, the expected answer and the student's answer.
+Evaluate if the student's answer is semantically correct compared to the expected answer. Consider:
+1. The core meaning and concepts are the same
+2. Minor wording differences are acceptable
+3. Synonyms and paraphrasing are acceptable
+4. Spelling and grammar errors should be ignored if the meaning is clear
+
+You must respond with ONLY a JSON object in this exact format:
+{
+  "is_correct": true or false,
+  "feedback": "Brief explanation of why the answer is correct or incorrect. If incorrect, provide the correct answer and optionally a helpful explanation."
+}
+
+Important:
+- The "is_correct" field must be a boolean (true/false)
+- The "feedback" field should be a concise string (1-2 sentences)
+- If the answer is correct, the feedback should be encouraging (e.g., "Correct! Great job.")
+- If incorrect, provide the correct answer and a brief explanation of why
+- DO NOT include any text before or after the JSON"""
+    SYSTEM_PROMPT = """You are an expert educational content creator specializing in creating high-quality flashcards.
 
 Your task is to analyze the provided text and generate flashcards using FOUR different question types:
 1. BASIC - Simple question and answer pairs
@@ -99,34 +486,23 @@ DO NOT include any text before or after the JSON. The response must be valid JSO
     @staticmethod
     def _create_user_prompt(content: str, num_cards: int) -> str:
         """Create the user prompt with content and requirements"""
-        return f"""Please analyze the following content and generate exactly {num_cards} high-quality flashcards.
-
-Content:
-{content}
-
-Generate exactly {num_cards} flashcards covering the most important concepts from this content.
-Respond with ONLY the JSON object, no additional text."""
+        return LLMService.USER_PROMPT_TEMPLATE.format(content=content, num_cards=num_cards)
 
     @staticmethod
-    async def generate_flashcards(
-        content: str,
-        num_cards: int,
-        user: User
-    ) -> List[Dict[str, Any]]:
+    def has_enough_content(content: Optional[str]) -> bool:
         """
-        Generate flashcards from content using the appropriate LLM provider.
-
-        Args:
-            content: Text content to generate flashcards from
-            num_cards: Number of flashcards to generate (5-20)
-            user: User object containing LLM settings
+        Return True if content is at least MIN_CONTENT_LENGTH characters once
+        surrounding whitespace is ignored.
 
-        Returns:
-            List of flashcard dictionaries with prompt, answer, and optional explanation
-
-        Raises:
-            HTTPException: If generation fails or no provider is available
+        Equivalent to ``len(content.strip()) >= MIN_CONTENT_LENGTH`` without
+        copying the whole (possibly very long) string: the search stops as soon
+        as two non-whitespace characters far enough apart have been seen.
         """
+        return bool(content) and _min_content_pattern(LLMService.MIN_CONTENT_LENGTH).search(content) is not None
+
+    @staticmethod
+    def _prepare_content(content: str, num_cards: int) -> str:
+        """Validate generation inputs and truncate content to what the LLM accepts"""
         # Validate number of cards
         if not 5 <= num_cards <= 20:
             raise HTTPException(
@@ -135,7 +511,7 @@ Respond with ONLY the JSON object, no additional text."""
             )
 
         # Validate content
-        if not content or len(content.strip()) < 50:
+        if not LLMService.has_enough_content(content):
             raise HTTPException(
                 status_code=400,
                 detail="Content too short. Please provide more substantial content for flashcard generation."
@@ -146,38 +522,151 @@ Respond with ONLY the JSON object, no additional text."""
             logger.warning(f"Content length {len(content)} exceeds maximum {LLMService.MAX_CONTENT_LENGTH}. Truncating.")
             content = content[:LLMService.MAX_CONTENT_LENGTH] + "\n\n[Content truncated for processing]"
 
-        # Determine which provider to use
-        use_openai = bool(user.openai_api_key)
-        use_ollama = not use_openai
+        return content
+
+    @staticmethod
+    def _uses_openai(user: Optional[User]) -> bool:
+        """
+        Return True if LLM calls for this user should go to OpenAI rather than Ollama.
+
+        OpenAI is used whenever the user has an API key, unless they prefer
+        Ollama; without a user there is no key, so Ollama is used.
+        """
+        if user is None or user.llm_provider_preference == "ollama":
+            return False
+        return bool(user.openai_api_key)
 
-        # If user has preference and API key, respect it
-        if user.llm_provider_preference == "openai" and user.openai_api_key:
-            use_openai = True
-            use_ollama = False
-        elif user.llm_provider_preference == "ollama":
-            use_openai = False
-            use_ollama = True
+    @staticmethod
+    def _check_generation_rate(user: User) -> None:
+        """Raise 429 if the user has used up their generation allowance"""
+        if not _generation_limiter.try_acquire(user.id):
+            logger.warning(f"Generation rate limit reached for user {user.id}")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many flashcard generation requests. Please wait a while and try again."
+            )
+
+    @staticmethod
+    def _validate_card(index: int, card: Any) -> Optional[Dict[str, Any]]:
+        """
+        Normalize a single generated card, or return None if it is unusable.
+
+        The type is optional and defaults to "basic"; multiple choice and cloze
+        cards are dropped when their type-specific fields are missing.
+        """
+        if not isinstance(card, dict) or "prompt" not in card or "answer" not in card:
+            logger.warning("Card {} missing required fields (prompt or answer), skipping", index)
+            return None
+
+        card_type = card.get("type", "basic")
+
+        # Validate card type
+        if not isinstance(card_type, str) or card_type not in _CARD_TYPES:
+            logger.warning("Card {} has invalid type {!r}, defaulting to 'basic'", index, card_type)
+            card_type = "basic"
+
+        validated_card = {
+            "type": card_type,
+            "prompt": card["prompt"],
+            "answer": card["answer"],
+            "explanation": card.get("explanation")
+        }
+
+        # Add type-specific fields
+        type_field = _TYPE_SPECIFIC_FIELDS.get(card_type)
+        if type_field is not None:
+            field, is_usable, problem = type_field
+            value = card.get(field)
+            if not is_usable(value, card):
+                logger.warning("Card {} is {} but {}, skipping", index, card_type, problem)
+                return None
+            validated_card[field] = value
+
+        return validated_card
+
+    @staticmethod
+    def _validate_cards(cards: List[Any], num_cards: int) -> List[Dict[str, Any]]:
+        """
+        Normalize every card of a generation reply, dropping unusable ones.
+
+        Raises:
+            ValueError: If none of the cards are usable
+        """
+        if len(cards) != num_cards:
+            logger.warning(
+                f"Requested {num_cards} cards but got {len(cards)}. Using what we got."
+            )
+
+        validated_cards = [
+            validated
+            for i, card in enumerate(cards)
+            if (validated := LLMService._validate_card(i, card)) is not None
+        ]
+
+        if not validated_cards:
+            logger.error(f"No valid flashcards generated. Total cards received: {len(cards)}")
+            if cards:
+                logger.error("Sample card structure: {}", cards[0])
+            raise ValueError("No valid flashcards were generated")
+
+        return validated_cards
+
+    @staticmethod
+    async def generate_flashcards(
+        content: str,
+        num_cards: int,
+        user: User
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate flashcards from content using the appropriate LLM provider.
+
+        Args:
+            content: Text content to generate flashcards from
+            num_cards: Number of flashcards to generate (5-20)
+            user: User object containing LLM settings
+
+        Returns:
+            List of flashcard dictionaries with prompt, answer, and optional explanation
+
+        Raises:
+            HTTPException: If generation fails or no provider is available
+        """
+        content = LLMService._prepare_content(content, num_cards)
+        uses_openai = LLMService._uses_openai(user)
+        model = LLMService.OPENAI_MODEL if uses_openai else LLMService.OLLAMA_MODEL
+        cache_key = _cache_key(model, num_cards, LLMService.TEMPERATURE, content)
+        cached = _generation_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Returning cached flashcards for user {user.id}")
+            return orjson.loads(cached)
+
+        LLMService._check_generation_rate(user)
+        batches = LLMService._plan_batches(content, num_cards)
 
         try:
-            if use_openai:
-                logger.info(f"Generating {num_cards} flashcards using OpenAI for user {user.id}")
-                return await LLMService._generate_with_openai(
-                    content, num_cards, user.openai_api_key
-                )
-            elif use_ollama:
-                logger.info(f"Generating {num_cards} flashcards using Ollama for user {user.id}")
+            if uses_openai:
+                logger.info(f"Generating {num_cards} flashcards in {len(batches)} batches using OpenAI for user {user.id}")
+                requests = [
+                    LLMService._generate_with_openai(passage, count, user.openai_api_key)
+                    for passage, count in batches
+                ]
+            else:
+                logger.info(f"Generating {num_cards} flashcards in {len(batches)} batches using Ollama for user {user.id}")
                 # First check if Ollama is available
                 if not await LLMService.check_ollama_availability():
                     raise HTTPException(
                         status_code=503,
                         detail="Ollama is not available. Please install Ollama or provide an OpenAI API key in settings."
                     )
-                return await LLMService._generate_with_ollama(content, num_cards)
-            else:
-                raise HTTPException(
-                    status_code=400,
-                    detail="No LLM provider configured. Please set up OpenAI API key or install Ollama."
-                )
+                requests = [
+                    LLMService._generate_with_ollama(passage, count)
+                    for passage, count in batches
+                ]
+
+            results = await asyncio.gather(*requests, return_exceptions=True)
+            cards = LLMService._merge_batches(results, num_cards)
+            _generation_cache.set(cache_key, orjson.dumps(cards))
+            return cards
 
         except HTTPException:
             raise
@@ -188,6 +677,60 @@ Respond with ONLY the JSON object, no additional text."""
                 detail=f"Failed to generate flashcards: {str(e)}"
             )
 
+    @staticmethod
+    def _plan_batches(content: str, num_cards: int) -> List[Tuple[str, int]]:
+        """
+        Split a generation request into (passage, card count) pairs.
+
+        Each batch asks for at most CARDS_PER_REQUEST cards from its own slice
+        of the content, so the batches can be decoded concurrently. Passages
+        overlap slightly so concepts on a boundary are not lost.
+        """
+        num_batches = math.ceil(num_cards / LLMService.CARDS_PER_REQUEST)
+        num_batches = max(1, min(num_batches, len(content) // LLMService.MIN_PASSAGE_LENGTH))
+        if num_batches == 1:
+            return [(content, num_cards)]
+
+        base, extra = divmod(num_cards, num_batches)
+        step = math.ceil(len(content) / num_batches)
+        batches = []
+        for i in range(num_batches):
+            start = max(0, i * step - LLMService.PASSAGE_OVERLAP)
+            end = min(len(content), (i + 1) * step + LLMService.PASSAGE_OVERLAP)
+            batches.append((content[start:end], base + (1 if i < extra else 0)))
+        return batches
+
+    @staticmethod
+    def _merge_batches(results: List[Any], num_cards: int) -> List[Dict[str, Any]]:
+        """Combine batch results, dropping duplicate prompts and failed batches"""
+        cards = []
+        seen_prompts = set()
+        errors = []
+        for result in results:
+            if isinstance(result, BaseException):
+                errors.append(result)
+                continue
+            for card in result:
+                key = str(card["prompt"]).strip().lower()
+                if key in seen_prompts:
+                    continue
+                seen_prompts.add(key)
+                cards.append(card)
+
+        if not cards:
+            # Every batch failed; surface the first error as a single request would have
+            raise errors[0] if errors else ValueError("No valid flashcards were generated")
+
+        if errors:
+            logger.warning(f"{len(errors)} of {len(results)} generation batches failed: {errors[0]}")
+
+        if len(cards) != num_cards:
+            logger.warning(
+                f"Requested {num_cards} cards but got {len(cards)}. Using what we got."
+            )
+
+        return cards[:num_cards]
+
     @staticmethod
     async def _generate_with_openai(
         content: str,
@@ -196,77 +739,28 @@ Respond with ONLY the JSON object, no additional text."""
     ) -> List[Dict[str, Any]]:
         """Generate flashcards using OpenAI API"""
         try:
-            client = AsyncOpenAI(api_key=api_key)
-
-            response = await client.chat.completions.create(
-                model=LLMService.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": LLMService._create_system_prompt()},
-                    {"role": "user", "content": LLMService._create_user_prompt(content, num_cards)}
-                ],
-                temperature=LLMService.TEMPERATURE,
-                max_tokens=LLMService.MAX_TOKENS,
-                response_format={"type": "json_object"}  # Ensure JSON response
-            )
-
-            # Parse the response
-            response_text = response.choices[0].message.content
-            flashcards_data = json.loads(response_text)
-
-            # Validate response structure
-            if "cards" not in flashcards_data:
-                raise ValueError("Invalid response format: missing 'cards' field")
-
-            cards = flashcards_data["cards"]
-
-            # Validate we got the right number of cards
-            if len(cards) != num_cards:
-                logger.warning(
-                    f"Requested {num_cards} cards but got {len(cards)}. Using what we got."
+            client = _openai_client(api_key)
+
+            async with _openai_slots():
+                response = await client.chat.completions.create(
+                    model=LLMService.OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": LLMService.SYSTEM_PROMPT},
+                        {"role": "user", "content": LLMService._create_user_prompt(content, num_cards)}
+                    ],
+                    temperature=LLMService.TEMPERATURE,
+                    max_tokens=LLMService.MAX_TOKENS,
+                    tools=[_SUBMIT_FLASHCARDS_TOOL],
+                    tool_choice=_SUBMIT_FLASHCARDS_CHOICE
                 )
 
-            # Validate each card
-            validated_cards = []
-            for i, card in enumerate(cards):
-                if "prompt" not in card or "answer" not in card or "type" not in card:
-                    logger.warning(f"Card {i} missing required fields, skipping")
-                    continue
-
-                card_type = card.get("type", "basic")
-
-                # Validate card type
-                if card_type not in ["basic", "multiple_choice", "short_answer", "cloze"]:
-                    logger.warning(f"Card {i} has invalid type '{card_type}', defaulting to 'basic'")
-                    card_type = "basic"
-
-                validated_card = {
-                    "type": card_type,
-                    "prompt": card["prompt"],
-                    "answer": card["answer"],
-                    "explanation": card.get("explanation")
-                }
-
-                # Add type-specific fields
-                if card_type == "multiple_choice":
-                    options = card.get("options", [])
-                    if not options or len(options) < 2:
-                        logger.warning(f"Card {i} is multiple_choice but has insufficient options, skipping")
-                        continue
-                    validated_card["options"] = options
-
-                elif card_type == "cloze":
-                    cloze_data = card.get("cloze_data")
-                    if not cloze_data or "blanks" not in cloze_data:
-                        logger.warning(f"Card {i} is cloze but missing cloze_data, skipping")
-                        continue
-                    validated_card["cloze_data"] = cloze_data
-
-                validated_cards.append(validated_card)
-
-            if not validated_cards:
-                raise ValueError("No valid flashcards were generated")
-
-            return validated_cards
+            # Parse the tool call arguments
+            tool_calls = response.choices[0].message.tool_calls
+            if not tool_calls:
+                raise ValueError("Invalid response format: no submit_flashcards call")
+            response_text = tool_calls[0].function.arguments
+            cards = _generated_cards_adapter.validate_json(response_text)["cards"]
+            return LLMService._validate_cards(cards, num_cards)
 
         except OpenAIError as e:
             logger.error(f"OpenAI API error: {str(e)}")
@@ -279,8 +773,8 @@ Respond with ONLY the JSON object, no additional text."""
                 status_code=500,
                 detail=f"OpenAI API error: {str(e)}"
             )
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse OpenAI response as JSON: {str(e)}")
+        except ValidationError as e:
+            logger.error(f"Failed to parse OpenAI response: {str(e)}")
             raise HTTPException(
                 status_code=500,
                 detail="Failed to parse LLM response. Please try again."
@@ -296,169 +790,238 @@ Respond with ONLY the JSON object, no additional text."""
     ) -> List[Dict[str, Any]]:
         """Generate flashcards using Ollama"""
         try:
-            async with httpx.AsyncClient(timeout=300.0) as client:  # Increased to 5 minutes for complex prompts
-                response = await client.post(
-                    f"{LLMService.OLLAMA_BASE_URL}/api/chat",
-                    json={
-                        "model": LLMService.OLLAMA_MODEL,
-                        "messages": [
-                            {"role": "system", "content": LLMService._create_system_prompt()},
-                            {"role": "user", "content": LLMService._create_user_prompt(content, num_cards)}
-                        ],
-                        "stream": False,
-                        "options": {
-                            "temperature": LLMService.TEMPERATURE,
-                            "num_predict": LLMService.MAX_TOKENS
-                        },
-                        "format": "json"  # Request JSON format
-                    }
-                )
+            # Consume the streamed reply: Ollama's non-streaming mode sends nothing
+            # until the model finishes, so the read timeout had to cover the whole
+            # generation; streamed, it only bounds the gap between tokens
+            response_text = "".join([
+                chunk async for chunk in LLMService._stream_ollama(content, num_cards)
+            ])
 
-                if response.status_code != 200:
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"Ollama API error: {response.text}"
-                    )
+            # Log the raw response for debugging; the slice is only taken when DEBUG is on
+            logger.opt(lazy=True).debug("Ollama raw response (first 500 chars): {}", lambda: response_text[:500])
 
-                result = response.json()
-                response_text = result.get("message", {}).get("content", "")
+            # Parse the response
+            cards = _generated_cards_adapter.validate_json(response_text)["cards"]
+            logger.info(f"Parsed {len(cards)} cards from Ollama response")
 
-                # Log the raw response for debugging
-                logger.debug(f"Ollama raw response (first 500 chars): {response_text[:500]}")
+            validated_cards = LLMService._validate_cards(cards, num_cards)
+            logger.info(f"Successfully validated {len(validated_cards)} flashcards")
+            return validated_cards
 
-                # Parse the response
-                flashcards_data = json.loads(response_text)
+        except ValidationError as e:
+            logger.error(f"Failed to parse Ollama response: {str(e)}")
+            logger.error(f"Response text (first 1000 chars): {response_text[:1000] if 'response_text' in locals() else 'N/A'}")
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to parse LLM response. The model may not be following JSON format. Please try again."
+            )
+        except Exception as e:
+            logger.error(f"Error in Ollama generation: {str(e)}")
+            raise
 
-                # Log the parsed response structure for debugging
-                logger.info(f"Parsed {len(flashcards_data.get('cards', []))} cards from Ollama response")
+    @staticmethod
+    async def stream_flashcards(
+        content: str,
+        num_cards: int,
+        user: User
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Start generating flashcards and return an iterator over validated cards.
 
-                # Validate response structure
-                if "cards" not in flashcards_data:
-                    logger.error(f"Invalid response format. Response keys: {flashcards_data.keys()}")
-                    raise ValueError("Invalid response format: missing 'cards' field")
+        Input validation and provider checks run before this returns, so they
+        still surface as regular HTTP errors. Cards are then yielded one at a
+        time as the provider streams them; errors after that point are raised
+        from the iterator as HTTPException.
 
-                cards = flashcards_data["cards"]
+        Args:
+            content: Text content to generate flashcards from
+            num_cards: Number of flashcards to generate (5-20)
+            user: User object containing LLM settings
 
-                # Validate we got cards
-                if len(cards) != num_cards:
-                    logger.warning(
-                        f"Requested {num_cards} cards but got {len(cards)}. Using what we got."
-                    )
+        Returns:
+            Async iterator of flashcard dictionaries
+        """
+        content = LLMService._prepare_content(content, num_cards)
+        LLMService._check_generation_rate(user)
+
+        if LLMService._uses_openai(user):
+            logger.info(f"Streaming {num_cards} flashcards using OpenAI for user {user.id}")
+            chunks = LLMService._stream_openai(content, num_cards, user.openai_api_key)
+        else:
+            logger.info(f"Streaming {num_cards} flashcards using Ollama for user {user.id}")
+            if not await LLMService.check_ollama_availability():
+                raise HTTPException(
+                    status_code=503,
+                    detail="Ollama is not available. Please install Ollama or provide an OpenAI API key in settings."
+                )
+            chunks = LLMService._stream_ollama(content, num_cards)
 
-                # Validate each card
-                validated_cards = []
-                for i, card in enumerate(cards):
-                    # Only require prompt and answer, type is optional and defaults to "basic"
-                    if "prompt" not in card or "answer" not in card:
-                        logger.warning(f"Card {i} missing required fields (prompt or answer). Card keys: {card.keys()}")
-                        continue
+        return LLMService._iter_streamed_cards(chunks)
 
-                    card_type = card.get("type", "basic")  # Default to basic if type is missing
-
-                    # Validate card type
-                    if card_type not in ["basic", "multiple_choice", "short_answer", "cloze"]:
-                        logger.warning(f"Card {i} has invalid type '{card_type}', defaulting to 'basic'")
-                        card_type = "basic"
-
-                    validated_card = {
-                        "type": card_type,
-                        "prompt": card["prompt"],
-                        "answer": card["answer"],
-                        "explanation": card.get("explanation")
-                    }
-
-                    # Add type-specific fields
-                    if card_type == "multiple_choice":
-                        options = card.get("options", [])
-                        if not options or len(options) < 2:
-                            logger.warning(f"Card {i} is multiple_choice but has insufficient options, skipping")
-                            continue
-                        validated_card["options"] = options
-
-                    elif card_type == "cloze":
-                        cloze_data = card.get("cloze_data")
-                        if not cloze_data or "blanks" not in cloze_data:
-                            logger.warning(f"Card {i} is cloze but missing cloze_data, skipping")
-                            continue
-                        validated_card["cloze_data"] = cloze_data
-
-                    validated_cards.append(validated_card)
-
-                if not validated_cards:
-                    logger.error(f"No valid flashcards generated. Total cards received: {len(cards)}")
-                    if cards:
-                        logger.error(f"Sample card structure: {cards[0]}")
-                    raise ValueError("No valid flashcards were generated")
-
-                logger.info(f"Successfully validated {len(validated_cards)} flashcards")
-                return validated_cards
-
-        except httpx.ConnectError:
-            logger.error("Could not connect to Ollama")
-            raise HTTPException(
-                status_code=503,
-                detail="Could not connect to Ollama. Please ensure Ollama is running."
-            )
-        except httpx.TimeoutException:
-            logger.error("Ollama request timed out")
+    @staticmethod
+    async def _iter_streamed_cards(chunks: AsyncIterator[str]) -> AsyncIterator[Dict[str, Any]]:
+        """Parse streamed response text into validated cards as they complete"""
+        parser = _CardStreamParser()
+        index = 0
+        emitted = 0
+        async for text in chunks:
+            for card in parser.feed(text):
+                validated = LLMService._validate_card(index, card)
+                index += 1
+                if validated is not None:
+                    emitted += 1
+                    yield validated
+
+        if not emitted:
             raise HTTPException(
-                status_code=504,
-                detail="Ollama request timed out. Please try again with shorter content."
+                status_code=500,
+                detail="Failed to generate flashcards: No valid flashcards were generated"
             )
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Ollama response as JSON: {str(e)}")
-            logger.error(f"Response text (first 1000 chars): {response_text[:1000] if 'response_text' in locals() else 'N/A'}")
+
+    @staticmethod
+    async def _stream_openai(content: str, num_cards: int, api_key: str) -> AsyncIterator[str]:
+        """Yield response text from OpenAI as it is generated"""
+        try:
+            client = _openai_client(api_key)
+
+            async with _openai_slots():
+                stream = await client.chat.completions.create(
+                    model=LLMService.OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": LLMService.SYSTEM_PROMPT},
+                        {"role": "user", "content": LLMService._create_user_prompt(content, num_cards)}
+                    ],
+                    temperature=LLMService.TEMPERATURE,
+                    max_tokens=LLMService.MAX_TOKENS,
+                    tools=[_SUBMIT_FLASHCARDS_TOOL],
+                    tool_choice=_SUBMIT_FLASHCARDS_CHOICE,
+                    stream=True
+                )
+
+                # The request is in flight until the stream is drained, so keep the slot.
+                # The forced call's arguments arrive as text fragments
+                async for chunk in stream:
+                    if not chunk.choices or not chunk.choices[0].delta.tool_calls:
+                        continue
+                    arguments = chunk.choices[0].delta.tool_calls[0].function.arguments
+                    if arguments:
+                        yield arguments
+
+        except OpenAIError as e:
+            logger.error(f"OpenAI API error: {str(e)}")
+            if "invalid_api_key" in str(e).lower():
+                raise HTTPException(
+                    status_code=401,
+                    detail="Invalid OpenAI API key. Please update your settings."
+                )
             raise HTTPException(
                 status_code=500,
-                detail="Failed to parse LLM response. The model may not be following JSON format. Please try again."
+                detail=f"OpenAI API error: {str(e)}"
             )
-        except Exception as e:
-            logger.error(f"Error in Ollama generation: {str(e)}")
-            raise
+
+    @staticmethod
+    async def _stream_ollama(content: str, num_cards: int) -> AsyncIterator[str]:
+        """
+        Yield response text from Ollama as it is generated.
+
+        Rate limits, server errors and timeouts are retried until the first
+        chunk has been yielded; after that a retry would repeat output. Read
+        timeouts are never retried, since the generation timeout is long.
+        """
+        body = orjson.dumps({
+            "model": LLMService.OLLAMA_MODEL,
+            "messages": [
+                {"role": "system", "content": LLMService.SYSTEM_PROMPT},
+                {"role": "user", "content": LLMService._create_user_prompt(content, num_cards)}
+            ],
+            "stream": True,
+            "options": {
+                "temperature": LLMService.TEMPERATURE,
+                "num_predict": LLMService.MAX_TOKENS,
+                "num_ctx": LLMService.OLLAMA_NUM_CTX
+            },
+            "format": "json"
+        })
+        client = _http_client()
+        retry = _OllamaRetry(retry_read_timeouts=False)
+        started = False
+        while True:
+            try:
+                async with client.stream(
+                    "POST",
+                    f"{LLMService.OLLAMA_BASE_URL}/api/chat",
+                    content=body,
+                    headers=_JSON_HEADERS,
+                    timeout=LLMService.OLLAMA_GENERATION_TIMEOUT
+                ) as response:
+                    if response.status_code == 200:
+                        # Ollama streams one JSON object per line
+                        async for line in response.aiter_lines():
+                            if not line:
+                                continue
+                            message = orjson.loads(line)
+                            text = message.get("message", {}).get("content")
+                            if text:
+                                started = True
+                                yield text
+                            if message.get("done"):
+                                break
+                        return
+                    error_body = await response.aread()
+
+            except httpx.ConnectError:
+                logger.error("Could not connect to Ollama")
+                raise HTTPException(
+                    status_code=503,
+                    detail="Could not connect to Ollama. Please ensure Ollama is running."
+                )
+            except httpx.TimeoutException as e:
+                if await retry.should_retry(timeout=e, started=started):
+                    continue
+                logger.error("Ollama request timed out")
+                raise HTTPException(
+                    status_code=504,
+                    detail="Ollama request timed out. Please try again with shorter content."
+                )
+
+            if not await retry.should_retry(response.status_code):
+                raise HTTPException(
+                    status_code=response.status_code,
+                    detail=f"Ollama API error: {error_body.decode(errors='replace')}"
+                )
 
     @staticmethod
     async def check_ollama_availability() -> bool:
         """
         Check if Ollama is available and running.
 
+        The result is cached for OLLAMA_STATUS_TTL_SECONDS.
+
         Returns:
             True if Ollama is available, False otherwise
         """
+        cached = _ollama_status_cache.get("ollama")
+        if cached is not None:
+            return cached
+
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{LLMService.OLLAMA_BASE_URL}/api/tags")
-                return response.status_code == 200
+            client = _http_client()
+            # HEAD skips serializing the installed model list
+            response = await client.head(f"{LLMService.OLLAMA_BASE_URL}/api/tags", timeout=2.0)
+            available = response.status_code == 200
         except Exception as e:
-            logger.debug(f"Ollama not available: {str(e)}")
-            return False
+            logger.debug("Ollama not available: {}", e)
+            available = False
+
+        _ollama_status_cache.set("ollama", available)
+        return available
 
     @staticmethod
     def _create_answer_checking_prompt(question: str, expected_answer: str, user_answer: str) -> str:
         """Create prompt for checking answer correctness"""
-        return f"""You are an expert educator tasked with evaluating student answers.
-
-Question: {question}
-Expected Answer: {expected_answer}
-Student's Answer: {user_answer}
-
-Evaluate if the student's answer is semantically correct compared to the expected answer. Consider:
-1. The core meaning and concepts are the same
-2. Minor wording differences are acceptable
-3. Synonyms and paraphrasing are acceptable
-4. Spelling and grammar errors should be ignored if the meaning is clear
-
-You must respond with ONLY a JSON object in this exact format:
-{{
-  "is_correct": true or false,
-  "feedback": "Brief explanation of why the answer is correct or incorrect. If incorrect, provide the correct answer and optionally a helpful explanation."
-}}
-
-Important:
-- The "is_correct" field must be a boolean (true/false)
-- The "feedback" field should be a concise string (1-2 sentences)
-- If the answer is correct, the feedback should be encouraging (e.g., "Correct! Great job.")
-- If incorrect, provide the correct answer and a brief explanation of why
-- DO NOT include any text before or after the JSON"""
+        return LLMService.ANSWER_CHECK_PROMPT_TEMPLATE.format(
+            question=question, expected_answer=expected_answer, user_answer=user_answer
+        )
 
     @staticmethod
     async def check_answer(
@@ -486,41 +1049,44 @@ Important:
         if not question or not expected_answer or not user_answer:
             return None
 
-        # Determine which provider to use
-        use_openai = user and bool(user.openai_api_key)
-        use_ollama = not use_openai
+        use_openai = LLMService._uses_openai(user)
+        model = LLMService.OPENAI_MODEL if use_openai else LLMService.OLLAMA_MODEL
+        cache_key = _cache_key(model, question, expected_answer, _answer_variant_key(user_answer))
+        cached = _answer_check_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Returning cached answer check")
+            return dict(cached)
 
-        if user and user.llm_provider_preference == "openai" and user.openai_api_key:
-            use_openai = True
-            use_ollama = False
-        elif user and user.llm_provider_preference == "ollama":
-            use_openai = False
-            use_ollama = True
+        if user is not None and not _answer_check_limiter.try_acquire(user.id):
+            logger.warning(f"Answer check rate limit reached for user {user.id}")
+            return None
 
         try:
             if use_openai:
                 logger.info("Checking answer using OpenAI")
-                return await LLMService._check_answer_with_openai(
+                result = await LLMService._check_answer_with_openai(
                     question, expected_answer, user_answer, user.openai_api_key
                 )
-            elif use_ollama:
+            else:
                 logger.info("Checking answer using Ollama")
                 # Check if Ollama is available
                 if await LLMService.check_ollama_availability():
-                    return await LLMService._check_answer_with_ollama(
+                    result = await LLMService._check_answer_with_ollama(
                         question, expected_answer, user_answer
                     )
                 else:
                     logger.warning("Ollama not available for answer checking")
                     return None
-            else:
-                logger.info("No LLM provider available for answer checking")
-                return None
 
         except Exception as e:
             logger.error(f"Error checking answer with LLM: {str(e)}")
             return None
 
+        if result is not None:
+            _answer_check_cache.set(cache_key, result)
+            result = dict(result)
+        return result
+
     @staticmethod
     async def _check_answer_with_openai(
         question: str,
@@ -530,21 +1096,22 @@ Important:
     ) -> Dict[str, Any]:
         """Check answer using OpenAI API"""
         try:
-            client = AsyncOpenAI(api_key=api_key)
-
-            response = await client.chat.completions.create(
-                model=LLMService.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are an expert educator evaluating student answers. Respond only with valid JSON."},
-                    {"role": "user", "content": LLMService._create_answer_checking_prompt(question, expected_answer, user_answer)}
-                ],
-                temperature=0.3,  # Lower temperature for more consistent evaluation
-                max_tokens=500,
-                response_format={"type": "json_object"}
-            )
+            client = _openai_client(api_key)
+
+            async with _openai_slots():
+                response = await client.chat.completions.create(
+                    model=LLMService.OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": LLMService.ANSWER_CHECK_SYSTEM_PROMPT},
+                        {"role": "user", "content": LLMService._create_answer_checking_prompt(question, expected_answer, user_answer)}
+                    ],
+                    temperature=0.3,  # Lower temperature for more consistent evaluation
+                    max_tokens=500,
+                    response_format={"type": "json_object"}
+                )
 
             response_text = response.choices[0].message.content
-            result = json.loads(response_text)
+            result = orjson.loads(response_text)
 
             # Validate response structure
             if "is_correct" not in result or "feedback" not in result:
@@ -565,39 +1132,53 @@ Important:
     ) -> Dict[str, Any]:
         """Check answer using Ollama"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{LLMService.OLLAMA_BASE_URL}/api/chat",
-                    json={
-                        "model": LLMService.OLLAMA_MODEL,
-                        "messages": [
-                            {"role": "system", "content": "You are an expert educator evaluating student answers. Respond only with valid JSON."},
-                            {"role": "user", "content": LLMService._create_answer_checking_prompt(question, expected_answer, user_answer)}
-                        ],
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.3,
-                            "num_predict": 500
-                        },
-                        "format": "json"
-                    }
-                )
+            client = _http_client()
+            body = orjson.dumps({
+                "model": LLMService.OLLAMA_MODEL,
+                "messages": [
+                    {"role": "system", "content": LLMService.ANSWER_CHECK_SYSTEM_PROMPT},
+                    {"role": "user", "content": LLMService._create_answer_checking_prompt(question, expected_answer, user_answer)}
+                ],
+                "stream": False,
+                "options": {
+                    "temperature": 0.3,
+                    "num_predict": 500
+                },
+                "format": "json"
+            })
+            # The reply is not streamed, so rate limits, server errors and
+            # timeouts can always be retried
+            retry = _OllamaRetry()
+            while True:
+                try:
+                    response = await client.post(
+                        f"{LLMService.OLLAMA_BASE_URL}/api/chat",
+                        content=body,
+                        headers=_JSON_HEADERS,
+                        timeout=30.0
+                    )
+                except httpx.TimeoutException as e:
+                    if not await retry.should_retry(timeout=e):
+                        raise
+                    continue
+                if response.status_code == 200 or not await retry.should_retry(response.status_code):
+                    break
 
-                if response.status_code != 200:
-                    logger.error(f"Ollama API error: {response.text}")
-                    return None
+            if response.status_code != 200:
+                logger.error(f"Ollama API error: {response.text}")
+                return None
 
-                result = response.json()
-                response_text = result.get("message", {}).get("content", "")
+            result = orjson.loads(response.content)
+            response_text = result.get("message", {}).get("content", "")
 
-                parsed_result = json.loads(response_text)
+            parsed_result = orjson.loads(response_text)
 
-                # Validate response structure
-                if "is_correct" not in parsed_result or "feedback" not in parsed_result:
-                    logger.error("Invalid response format from Ollama")
-                    return None
+            # Validate response structure
+            if "is_correct" not in parsed_result or "feedback" not in parsed_result:
+                logger.error("Invalid response format from Ollama")
+                return None
 
-                return parsed_result
+            return parsed_result
 
         except Exception as e:
             logger.error(f"Error in Ollama answer checking: {str(e)}")
@@ -1,10 +1,13 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Iterable, List, Tuple, Optional, Dict, Any
-import json
+from functools import lru_cache
+from typing import Callable, Iterable, List, Tuple, Optional, Dict, Any
 
+import orjson
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import case, func, select
 from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..models import Card, QuizResponse, QuizSession, SRSReview, User, UserDeckProgress
 from ..models.enums import CardType, QuizMode, QuizStatus
@@ -38,6 +41,7 @@ def finish_session(db: Session, session: QuizSession, user: User) -> QuizSession
     session.status = QuizStatus.COMPLETED
     session.ended_at = datetime.now(tz=timezone.utc)
     db.add(session)
+    _resync_progress(db, user, session.deck_id)
 
     # Update user's streak when they complete a session
     streak_service.update_user_streak(db, user)
@@ -47,16 +51,31 @@ def finish_session(db: Session, session: QuizSession, user: User) -> QuizSession
     return session
 
 
-def _get_review_state(db: Session, user: User, card: Card) -> SRSReview:
-    review = db.exec(
-        select(SRSReview).where(SRSReview.user_id == user.id, SRSReview.card_id == card.id)
-    ).scalar_one_or_none()
-    if review:
-        return review
-    review = SRSReview(user_id=user.id, card_id=card.id)
-    db.add(review)
-    db.flush()
-    return review
+def _get_review_states(db: Session, user: User, card_ids: Iterable[int]) -> Dict[int, SRSReview]:
+    """
+    Load the user's review state for each card, starting new ones where missing.
+
+    Existing rows are fetched in one query through the (user_id, card_id)
+    unique index. New rows start from the model defaults and are inserted
+    together with the rest of the answers at commit rather than flushed on
+    their own.
+    """
+    card_ids = set(card_ids)
+    reviews = {
+        review.card_id: review
+        for review in db.exec(
+            select(SRSReview).where(SRSReview.user_id == user.id, SRSReview.card_id.in_(card_ids))
+        ).scalars()
+    }
+    for card_id in card_ids - reviews.keys():
+        review = SRSReview(user_id=user.id, card_id=card_id)
+        db.add(review)
+        reviews[card_id] = review
+    return reviews
+
+
+# SM-2 easiness adjustment for each quality grade 0-5
+_SM2_EASINESS_DELTA = tuple(0.1 - (5 - q) * (0.08 + (5 - q) * 0.02) for q in range(6))
 
 
 def _apply_sm2(review: SRSReview, quality: int) -> None:
@@ -77,10 +96,7 @@ def _apply_sm2(review: SRSReview, quality: int) -> None:
             review.interval_days = max(1, round(review.interval_days * review.easiness))
             review.repetitions += 1
 
-    review.easiness = max(
-        1.3,
-        review.easiness + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)),
-    )
+    review.easiness = max(1.3, review.easiness + _SM2_EASINESS_DELTA[quality])
     review.last_quality = quality
     review.due_at = datetime.now(tz=timezone.utc) + timedelta(days=review.interval_days)
 
@@ -92,6 +108,11 @@ def _normalize_answer(text: str | None) -> str:
     return text.strip().lower()
 
 
+# Card answers repeat across every attempt at a card, so their normalized form is
+# memoized; user answers are unbounded free text and are normalized uncached.
+_normalize_card_answer = lru_cache(maxsize=2048)(_normalize_answer)
+
+
 def _check_cloze_answer(card: Card, user_answer: str | None) -> bool:
     """
     Check if user answer is correct for CLOZE type cards.
@@ -103,7 +124,7 @@ def _check_cloze_answer(card: Card, user_answer: str | None) -> bool:
 
     try:
         # Parse user answers
-        user_answers = json.loads(user_answer) if isinstance(user_answer, str) else user_answer
+        user_answers = orjson.loads(user_answer) if isinstance(user_answer, str) else user_answer
         if not isinstance(user_answers, list):
             return False
 
@@ -112,53 +133,55 @@ def _check_cloze_answer(card: Card, user_answer: str | None) -> bool:
         if len(user_answers) != len(blanks):
             return False
 
-        # Check each blank
-        for i, blank in enumerate(blanks):
-            user_ans = _normalize_answer(user_answers[i])
-
-            # Get acceptable answers for this blank
-            if "answer" in blank:
-                acceptable = blank["answer"]
-                # Support both single answer and multiple acceptable answers
-                if isinstance(acceptable, list):
-                    acceptable_answers = [_normalize_answer(ans) for ans in acceptable]
-                else:
-                    acceptable_answers = [_normalize_answer(acceptable)]
+        # Check each blank, stopping at the first wrong one
+        for user_ans, blank in zip(user_answers, blanks):
+            if "answer" not in blank:
+                return False
 
-                if user_ans not in acceptable_answers:
+            # Support both single answer and multiple acceptable answers
+            acceptable = blank["answer"]
+            user_ans = _normalize_answer(user_ans)
+            if isinstance(acceptable, list):
+                if not any(user_ans == _normalize_card_answer(ans) for ans in acceptable):
                     return False
-            else:
+            elif user_ans != _normalize_card_answer(acceptable):
                 return False
 
         return True
-    except (json.JSONDecodeError, KeyError, IndexError):
+    except (orjson.JSONDecodeError, KeyError, IndexError):
         return False
 
 
-def _check_answer_correctness(card: Card, user_answer: str | None) -> bool:
-    """Check if user answer is correct for the given card type."""
-    if not user_answer:
-        return False
+def _check_multiple_choice_answer(card: Card, user_answer: str) -> bool:
+    return user_answer == card.answer
+
 
+def _check_short_answer(card: Card, user_answer: str) -> bool:
     normalized_user_answer = _normalize_answer(user_answer)
+    # Support multiple valid answers stored in options
+    # If options is None or empty, fall back to exact match with card.answer
+    if card.options:
+        # options can be a list of acceptable answers
+        valid_answers = card.options if isinstance(card.options, list) else [card.answer]
+        return any(normalized_user_answer == _normalize_card_answer(ans) for ans in valid_answers)
+    return normalized_user_answer == _normalize_card_answer(card.answer)
 
-    if card.type == CardType.MULTIPLE_CHOICE:
-        return user_answer == card.answer
 
-    elif card.type == CardType.SHORT_ANSWER:
-        # For SHORT_ANSWER, support multiple valid answers stored in options
-        # If options is None or empty, fall back to exact match with card.answer
-        if card.options:
-            # options can be a list of acceptable answers
-            valid_answers = card.options if isinstance(card.options, list) else [card.answer]
-            return normalized_user_answer in [_normalize_answer(ans) for ans in valid_answers]
-        else:
-            return normalized_user_answer == _normalize_answer(card.answer)
+# Answer checkers for the card types that can be graded automatically
+_ANSWER_CHECKERS: Dict[CardType, Callable[[Card, str], bool]] = {
+    CardType.MULTIPLE_CHOICE: _check_multiple_choice_answer,
+    CardType.SHORT_ANSWER: _check_short_answer,
+    CardType.CLOZE: _check_cloze_answer,
+}
+
 
-    elif card.type == CardType.CLOZE:
-        return _check_cloze_answer(card, user_answer)
+def _check_answer_correctness(card: Card, user_answer: str | None) -> bool:
+    """Check if user answer is correct for the given card type."""
+    if not user_answer:
+        return False
 
-    return False
+    checker = _ANSWER_CHECKERS.get(card.type)
+    return checker(card, user_answer) if checker else False
 
 
 async def _check_answer_with_llm(card: Card, user_answer: str | None, user: User) -> Optional[Dict[str, Any]]:
@@ -205,23 +228,27 @@ async def _check_answer_with_llm(card: Card, user_answer: str | None, user: User
         return None
 
 
-async def record_answer(
-    db: Session,
+def is_llm_graded(session: QuizSession, card: Card) -> bool:
+    """Whether answers to this card in this session are checked by the LLM."""
+    return session.mode in (QuizMode.PRACTICE, QuizMode.EXAM) and card.type in (CardType.SHORT_ANSWER, CardType.CLOZE)
+
+
+async def _grade_answer(
     session: QuizSession,
     card: Card,
     user: User,
     answer_in: StudyAnswerCreate,
-) -> tuple[QuizResponse, Optional[str]]:
+) -> Tuple[bool | None, Optional[str]]:
     """
-    Record a user's answer to a card.
+    Grade an answer for the session's mode.
 
     Returns:
-        Tuple of (QuizResponse, llm_feedback)
+        Tuple of (is_correct, llm_feedback); is_correct is None when the mode
+        or card type isn't auto-graded
     """
     from loguru import logger
 
     is_correct: bool | None = None
-    quality = answer_in.quality
     llm_feedback: Optional[str] = None
 
     logger.info(f"record_answer: session mode={session.mode}, card type={card.type}")
@@ -230,7 +257,7 @@ async def record_answer(
     if session.mode in [QuizMode.PRACTICE, QuizMode.EXAM] and card.type in [CardType.MULTIPLE_CHOICE, CardType.SHORT_ANSWER, CardType.CLOZE]:
         logger.info(f"Auto-grading for {session.mode} mode")
         # Try LLM-based checking first for SHORT_ANSWER and CLOZE
-        if card.type in [CardType.SHORT_ANSWER, CardType.CLOZE]:
+        if is_llm_graded(session, card):
             logger.info(f"Attempting LLM check for {card.type}")
             llm_result = await _check_answer_with_llm(card, answer_in.user_answer, user)
             if llm_result:
@@ -248,77 +275,183 @@ async def record_answer(
     else:
         logger.info(f"Not auto-grading: mode={session.mode}, card_type={card.type}")
 
-    response = QuizResponse(
-        session_id=session.id,
-        card_id=card.id,
-        user_answer=answer_in.user_answer,
-        quality=quality,
-        is_correct=is_correct,
-    )
-    db.add(response)
+    return is_correct, llm_feedback
 
-    if session.mode == QuizMode.REVIEW and quality is not None:
-        review = _get_review_state(db, user, card)
-        _apply_sm2(review, quality)
 
-    _update_progress(db, user, session.deck_id)
+async def record_answer(
+    db: Session,
+    session: QuizSession,
+    card: Card,
+    user: User,
+    answer_in: StudyAnswerCreate,
+) -> tuple[QuizResponse, Optional[str]]:
+    """
+    Record a user's answer to a card.
 
-    db.commit()
-    db.refresh(response)
+    Returns:
+        Tuple of (QuizResponse, llm_feedback)
+    """
+    is_correct, llm_feedback = await _grade_answer(session, card, user, answer_in)
+    response = await run_in_threadpool(_save_answer, db, session, card, user, answer_in, is_correct)
     return response, llm_feedback
 
 
-def _update_progress(db: Session, user: User, deck_id: int) -> None:
-    progress = db.exec(
-        select(UserDeckProgress).where(UserDeckProgress.user_id == user.id, UserDeckProgress.deck_id == deck_id)
-    ).scalar_one_or_none()
+async def record_answers_bulk(
+    db: Session,
+    session: QuizSession,
+    cards: List[Card],
+    user: User,
+    answers: List[StudyAnswerCreate],
+) -> List[Tuple[QuizResponse, Optional[str]]]:
+    """
+    Record several answers to cards in a session with a single commit.
 
-    if not progress:
-        progress = UserDeckProgress(user_id=user.id, deck_id=deck_id, percent_complete=0.0)
-        db.add(progress)
+    Answers are graded concurrently, then saved in request order.
 
-    total_cards = int(db.exec(select(func.count(Card.id)).where(Card.deck_id == deck_id)).scalar_one())
+    Args:
+        cards: The card each answer is for, in the same order as answers
 
-    reviewed_cards = int(
-        db.exec(
-            select(func.count(QuizResponse.id))
-            .join(QuizSession, QuizSession.id == QuizResponse.session_id)
-            .where(
-                QuizSession.user_id == user.id,
-                QuizSession.deck_id == deck_id,
-            )
-        ).scalar_one()
-    )
+    Returns:
+        List of (QuizResponse, llm_feedback) tuples in request order
+    """
+    grades = await asyncio.gather(*[
+        _grade_answer(session, card, user, answer_in)
+        for card, answer_in in zip(cards, answers)
+    ])
+    graded = [
+        (card, answer_in, is_correct)
+        for card, answer_in, (is_correct, _) in zip(cards, answers, grades)
+    ]
+    responses = await run_in_threadpool(_save_answers, db, session, user, graded)
+    return [(response, llm_feedback) for response, (_, llm_feedback) in zip(responses, grades)]
+
+
+def _save_answer(
+    db: Session,
+    session: QuizSession,
+    card: Card,
+    user: User,
+    answer_in: StudyAnswerCreate,
+    is_correct: bool | None,
+) -> QuizResponse:
+    """Persist a graded answer; runs on the threadpool so DB I/O stays off the event loop."""
+    return _save_answers(db, session, user, [(card, answer_in, is_correct)])[0]
 
-    if total_cards:
-        progress.percent_complete = min(100.0, (reviewed_cards / total_cards) * 100)
+
+def _save_answers(
+    db: Session,
+    session: QuizSession,
+    user: User,
+    graded: List[Tuple[Card, StudyAnswerCreate, bool | None]],
+) -> List[QuizResponse]:
+    """Persist graded answers in one transaction and return them in order."""
+    responses = [
+        QuizResponse(
+            session_id=session.id,
+            card_id=card.id,
+            user_answer=answer_in.user_answer,
+            quality=answer_in.quality,
+            is_correct=is_correct,
+        )
+        for card, answer_in, is_correct in graded
+    ]
+    db.add_all(responses)
+
+    if session.mode == QuizMode.REVIEW:
+        reviewed = [(card, answer_in) for card, answer_in, _ in graded if answer_in.quality is not None]
+        if reviewed:
+            reviews = _get_review_states(db, user, (card.id for card, _ in reviewed))
+            for card, answer_in in reviewed:
+                _apply_sm2(reviews[card.id], answer_in.quality)
+
+    _update_progress(db, user, session.deck_id, answered=len(responses))
+
+    db.flush()
+    response_ids = [response.id for response in responses]
+    db.commit()
+
+    # Reload the committed rows (and their server-side defaults) in one query
+    db.exec(select(QuizResponse).where(QuizResponse.id.in_(response_ids))).all()
+    return responses
+
+
+def _deck_card_count(deck_id: int):
+    return select(func.count(Card.id)).where(Card.deck_id == deck_id).scalar_subquery()
+
+
+def _update_progress(db: Session, user: User, deck_id: int, answered: int = 1) -> None:
+    """Count newly recorded answers towards the user's progress on a deck."""
+    # Fetch the progress row and the deck's card count in one round trip
+    row = db.exec(
+        select(UserDeckProgress, _deck_card_count(deck_id)).where(
+            UserDeckProgress.user_id == user.id, UserDeckProgress.deck_id == deck_id
+        )
+    ).first()
+
+    if not row:
+        total_cards = db.exec(select(_deck_card_count(deck_id))).scalar_one()
+        progress = UserDeckProgress(user_id=user.id, deck_id=deck_id, percent_complete=0.0, responses_count=answered)
+        if total_cards:
+            progress.percent_complete = min(100.0, (answered / total_cards) * 100)
+    else:
+        progress, total_cards = row
+        # Increment in SQL so concurrent answers can't overwrite each other's count
+        responses_count = UserDeckProgress.responses_count + answered
+        progress.responses_count = responses_count
+        if total_cards:
+            percent = responses_count * 100.0 / total_cards
+            progress.percent_complete = case((percent > 100.0, 100.0), else_=percent)
     progress.last_studied_at = datetime.now(tz=timezone.utc)
     progress.streak = max(progress.streak, 1)
 
     db.add(progress)
 
 
+def _resync_progress(db: Session, user: User, deck_id: int) -> None:
+    """Recount the user's answers on a deck, correcting drift from deleted cards or sessions."""
+    responses_count = (
+        select(func.count(QuizResponse.id))
+        .join(QuizSession, QuizSession.id == QuizResponse.session_id)
+        .where(
+            QuizSession.user_id == user.id,
+            QuizSession.deck_id == deck_id,
+        )
+        .scalar_subquery()
+    )
+    row = db.exec(
+        select(UserDeckProgress, responses_count, _deck_card_count(deck_id)).where(
+            UserDeckProgress.user_id == user.id, UserDeckProgress.deck_id == deck_id
+        )
+    ).first()
+    if not row:
+        return
+
+    progress, answered, total_cards = row
+    progress.responses_count = answered
+    if total_cards:
+        progress.percent_complete = min(100.0, (progress.responses_count / total_cards) * 100)
+    db.add(progress)
+
+
 def due_reviews(db: Session, user: User) -> List[DueReviewCard]:
+    # Select only the columns DueReviewCard needs rather than whole ORM rows,
+    # so card text is never loaded
     rows = db.exec(
-        select(SRSReview, Card)
+        select(
+            SRSReview.card_id,
+            Card.deck_id,
+            SRSReview.due_at,
+            SRSReview.repetitions,
+            SRSReview.interval_days,
+            SRSReview.easiness,
+        )
         .join(Card, Card.id == SRSReview.card_id)
-        .where(SRSReview.user_id == user.id, SRSReview.due_at <= func.now())
+        .where(SRSReview.user_id == user.id, SRSReview.due_at <= datetime.now(tz=timezone.utc))
         .order_by(SRSReview.due_at)
     ).all()
 
-    results: list[DueReviewCard] = []
-    for review, card in rows:
-        results.append(
-            DueReviewCard(
-                card_id=card.id,
-                deck_id=card.deck_id,
-                due_at=review.due_at,
-                repetitions=review.repetitions,
-                interval_days=review.interval_days,
-                easiness=review.easiness,
-            )
-        )
-    return results
+    # Every field comes from a typed, non-null column, so skip re-validating rows
+    return [DueReviewCard.model_construct(**row._mapping) for row in rows]
 
 
 def get_session_statistics(db: Session, session: QuizSession) -> dict:
@@ -5,10 +5,11 @@ from typing import Generator
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine, select
 from sqlmodel.pool import StaticPool
 
-from app.services.auth import create_access_token, hash_password
+from app.services.auth import create_access_token, hash_password, pwd_context
 from app.db.session import get_db
 from app.main import app
 from app.models import Card, Deck, QuizResponse, QuizSession, SRSReview, User, UserDeckProgress
@@ -19,34 +20,73 @@ warnings.filterwarnings("ignore", category=ResourceWarning)
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
 
-@pytest.fixture(name="engine")
+@pytest.fixture(autouse=True, scope="session")
+def cheap_password_hashing():
+    """Hash test passwords with the cheapest argon2 parameters instead of production cost."""
+    pwd_context.update(argon2__memory_cost=8, argon2__time_cost=1, argon2__parallelism=1)
+
+
+@pytest.fixture(autouse=True)
+def clear_llm_caches():
+    """Keep cached LLM results, rate limits and clients from leaking between tests."""
+    from app.services import llm_service
+
+    llm_service._generation_cache.clear()
+    llm_service._answer_check_cache.clear()
+    llm_service._generation_limiter.clear()
+    llm_service._answer_check_limiter.clear()
+    # Tests patch AsyncOpenAI, so don't hand a previous test's client back out
+    llm_service._openai_client.cache_clear()
+
+
+@pytest.fixture(name="engine", scope="session")
 def engine_fixture():
-    """Create an in-memory SQLite engine for testing."""
+    """Create an in-memory SQLite engine with the schema, once per test run."""
     engine = create_engine(
         "sqlite:///:memory:",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+
+    # pysqlite manages transactions itself and breaks SAVEPOINTs; let
+    # SQLAlchemy emit BEGIN so each test can be rolled back
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     SQLModel.metadata.create_all(engine)
-    return engine
+    yield engine
+    engine.dispose()
 
 
 @pytest.fixture(name="db")
 def db_fixture(engine) -> Generator[Session, None, None]:
-    """Create a fresh database session for each test."""
-    with Session(engine) as session:
-        yield session
+    """Create a database session whose changes, commits included, are rolled back after the test."""
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        with Session(bind=connection, join_transaction_mode="create_savepoint") as session:
+            yield session
+        transaction.rollback()
+
+
+@pytest.fixture(name="shared_client", scope="session")
+def shared_client_fixture() -> TestClient:
+    """One TestClient for the whole run; the app's lifespan is never started."""
+    return TestClient(app)
 
 
 @pytest.fixture(name="client")
-def client_fixture(db: Session) -> Generator[TestClient, None, None]:
-    """Create a test client with database dependency override."""
+def client_fixture(db: Session, shared_client: TestClient) -> Generator[TestClient, None, None]:
+    """Point the shared test client at this test's database session."""
     def get_db_override():
         return db
 
     app.dependency_overrides[get_db] = get_db_override
-    client = TestClient(app)
-    yield client
+    yield shared_client
     app.dependency_overrides.clear()
 
 
@@ -158,11 +198,12 @@ def test_cards_fixture(db: Session, test_deck: Deck) -> list[Card]:
             explanation="Python is a high-level programming language",
         ),
     ]
-    for card in cards:
-        db.add(card)
+    db.add_all(cards)
+    db.flush()
+    card_ids = [card.id for card in cards]
     db.commit()
-    for card in cards:
-        db.refresh(card)
+    # Reload all the expired cards with one query rather than a refresh each
+    db.exec(select(Card).where(Card.id.in_(card_ids))).all()
     return cards
 
 
@@ -3,16 +3,39 @@ Test cases for AI-powered deck generation feature.
 Tests LLM service, card validation, and API endpoints.
 """
 
+import asyncio
 import json
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import orjson
 import pytest
 from fastapi import HTTPException
 
+from app.api.routes.ai_decks import _BLANK_RE
 from app.models.enums import CardType
 from app.services.llm_service import LLMService
 
 
+def tool_reply(arguments):
+    """A completion choice whose message calls submit_flashcards with the given arguments"""
+    if not isinstance(arguments, str):
+        arguments = json.dumps(arguments)
+    tool_call = SimpleNamespace(function=SimpleNamespace(arguments=arguments))
+    return SimpleNamespace(message=SimpleNamespace(content=None, tool_calls=[tool_call]))
+
+
+class FakeOpenAIClient:
+    """Stand-in for AsyncOpenAI whose chat completions always return the given choices"""
+
+    def __init__(self, *choices):
+        self._completion = SimpleNamespace(choices=list(choices))
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        return self._completion
+
+
 class TestLLMServiceValidation:
     """Test card validation logic in LLM service"""
 
@@ -74,7 +97,7 @@ class TestLLMServiceValidation:
         }
 
         assert card["type"] == "cloze"
-        assert "[BLANK]" in card["prompt"].upper()
+        assert _BLANK_RE.search(card["prompt"])
         assert "cloze_data" in card
         assert "blanks" in card["cloze_data"]
         assert len(card["cloze_data"]["blanks"]) > 0
@@ -128,7 +151,7 @@ class TestLLMServiceValidation:
             "cloze_data": {"blanks": [{"answer": "Python"}]}
         }
 
-        assert "[BLANK]" not in card["prompt"].upper()  # Should be detected as invalid
+        assert not _BLANK_RE.search(card["prompt"])  # Should be detected as invalid
 
     def test_invalid_cloze_missing_cloze_data(self):
         """Test that cloze cards must have cloze_data"""
@@ -166,6 +189,39 @@ class TestLLMServiceGeneration:
         # Valid
         assert 5 <= 10 <= 20  # Should pass
 
+    def test_has_enough_content_ignores_surrounding_whitespace(self):
+        """Test that the content length floor matches len(content.strip())"""
+        assert not LLMService.has_enough_content(None)
+        assert not LLMService.has_enough_content(" " * 200 + "A" * 49 + "\n" * 200)
+        assert LLMService.has_enough_content(" " * 200 + "A" * 50 + "\n" * 200)
+        assert LLMService.has_enough_content("A" + " " * 48 + "B")
+        assert not LLMService.has_enough_content("A" + " " * 47 + "B")
+
+    def test_ollama_context_fits_longest_request(self):
+        """Test that Ollama's context window holds a full-length prompt and reply"""
+        content = LLMService._prepare_content("A" * (LLMService.MAX_CONTENT_LENGTH * 2), 20)
+        instructions = LLMService.SYSTEM_PROMPT + LLMService._create_user_prompt("", 20)
+        # Upper bounds: one token per content character (e.g. CJK text), and one
+        # per three characters of the fixed English instructions
+        prompt_tokens = len(content) + len(instructions) // 3
+        assert prompt_tokens + LLMService.MAX_TOKENS <= LLMService.OLLAMA_NUM_CTX
+
+    @pytest.mark.parametrize("preference,api_key,expected", [
+        ("openai", "sk-test", True),
+        (None, "sk-test", True),
+        ("ollama", "sk-test", False),
+        ("openai", None, False),
+        (None, None, False),
+    ])
+    def test_provider_selection(self, preference, api_key, expected):
+        """Test that OpenAI is used whenever there is a key, unless Ollama is preferred"""
+        user = MagicMock(llm_provider_preference=preference, openai_api_key=api_key)
+        assert LLMService._uses_openai(user) is expected
+
+    def test_provider_selection_without_user(self):
+        """Test that answer checks without a user go to Ollama"""
+        assert LLMService._uses_openai(None) is False
+
     def test_content_truncation(self):
         """Test that long content is truncated"""
         max_length = LLMService.MAX_CONTENT_LENGTH
@@ -180,7 +236,7 @@ class TestLLMServiceGeneration:
 
     def test_system_prompt_contains_all_types(self):
         """Test that system prompt instructs for all 4 card types"""
-        system_prompt = LLMService._create_system_prompt()
+        system_prompt = LLMService.SYSTEM_PROMPT
 
         assert "basic" in system_prompt.lower()
         assert "multiple_choice" in system_prompt.lower() or "multiple choice" in system_prompt.lower()
@@ -189,7 +245,7 @@ class TestLLMServiceGeneration:
 
     def test_system_prompt_has_json_format(self):
         """Test that system prompt instructs JSON output"""
-        system_prompt = LLMService._create_system_prompt()
+        system_prompt = LLMService.SYSTEM_PROMPT
 
         assert "json" in system_prompt.lower()
         assert "cards" in system_prompt  # Expected JSON structure
@@ -204,6 +260,63 @@ class TestLLMServiceGeneration:
         assert str(num_cards) in user_prompt
         assert content in user_prompt
 
+    def test_prompts_keep_braces_in_inputs_verbatim(self):
+        """Test that template placeholders in user input are not expanded"""
+        content = "Sets are written {a, b} and dicts {key: value} or {num_cards}."
+        assert content in LLMService._create_user_prompt(content, 5)
+
+        prompt = LLMService._create_answer_checking_prompt("What is {x}?", "{x}", "{}")
+        assert "Question: What is {x}?" in prompt
+        assert "Student's Answer: {}" in prompt
+
+    def test_varying_input_comes_after_static_instructions(self):
+        """Test that prompts end with the per-request input so providers can cache the prefix"""
+        content = "Mitochondria are the powerhouse of the cell. " * 3
+        assert LLMService._create_user_prompt(content, 5).endswith(content)
+
+        prompt = LLMService._create_answer_checking_prompt("Capital of France?", "Paris", "paris")
+        assert prompt.endswith("Student's Answer: paris")
+        assert '"is_correct": true or false' in LLMService.ANSWER_CHECK_SYSTEM_PROMPT
+
+    def test_short_content_is_a_single_batch(self):
+        """Test that content too short to split is sent in one request"""
+        content = "A" * 500
+        assert LLMService._plan_batches(content, 20) == [(content, 20)]
+
+    def test_long_content_is_split_into_batches(self):
+        """Test that large requests are split into overlapping passages"""
+        content = "".join(str(i % 10) for i in range(LLMService.MAX_CONTENT_LENGTH))
+        batches = LLMService._plan_batches(content, 18)
+
+        assert len(batches) == 5
+        assert sum(count for _, count in batches) == 18
+        assert all(count <= LLMService.CARDS_PER_REQUEST for _, count in batches)
+        assert batches[0][0].startswith(content[:100])
+        assert batches[-1][0].endswith(content[-100:])
+
+    def test_validate_cards_drops_unusable_cards(self):
+        """Test that cards missing type-specific fields are dropped"""
+        cards = [
+            {"prompt": "What is AI?", "answer": "Artificial Intelligence"},
+            {"type": "multiple_choice", "prompt": "2+2?", "answer": "4", "options": ["4"]},
+            {"type": "multiple_choice", "prompt": "3+3?", "answer": "6", "options": ["5", "6"]},
+            {"type": "multiple_choice", "prompt": "4+4?", "answer": "8", "options": ["5", "6"]},
+            {"type": "cloze", "prompt": "[BLANK] is blue", "answer": "Sky", "cloze_data": {}},
+            {"type": "essay", "prompt": "Why?", "answer": "Because"},
+            {"type": ["cloze"], "prompt": "How?", "answer": "Like so"},
+        ]
+
+        validated = LLMService._validate_cards(cards, len(cards))
+
+        assert [c["prompt"] for c in validated] == ["What is AI?", "3+3?", "Why?", "How?"]
+        assert [c["type"] for c in validated] == ["basic", "multiple_choice", "basic", "basic"]
+        assert validated[1]["options"] == ["5", "6"]
+
+    def test_validate_cards_rejects_reply_without_usable_cards(self):
+        """Test that a reply with no usable cards is an error"""
+        with pytest.raises(ValueError):
+            LLMService._validate_cards([{"prompt": "No answer"}], 1)
+
 
 class TestMockedLLMGeneration:
     """Test LLM generation with mocked responses"""
@@ -229,16 +342,7 @@ class TestMockedLLMGeneration:
             ]
         }
 
-        with patch("app.services.llm_service.AsyncOpenAI") as mock_openai:
-            # Setup mock
-            mock_client = AsyncMock()
-            mock_openai.return_value = mock_client
-            mock_completion = AsyncMock()
-            mock_completion.choices = [
-                MagicMock(message=MagicMock(content=json.dumps(mock_response)))
-            ]
-            mock_client.chat.completions.create.return_value = mock_completion
-
+        with patch("app.services.llm_service.AsyncOpenAI", return_value=FakeOpenAIClient(tool_reply(mock_response))):
             # Test generation
             result = await LLMService._generate_with_openai(
                 content="Test content",
@@ -254,16 +358,7 @@ class TestMockedLLMGeneration:
     @pytest.mark.asyncio
     async def test_openai_generation_invalid_json(self):
         """Test OpenAI generation with invalid JSON response"""
-        with patch("app.services.llm_service.AsyncOpenAI") as mock_openai:
-            # Setup mock to return invalid JSON
-            mock_client = AsyncMock()
-            mock_openai.return_value = mock_client
-            mock_completion = AsyncMock()
-            mock_completion.choices = [
-                MagicMock(message=MagicMock(content="Invalid JSON response"))
-            ]
-            mock_client.chat.completions.create.return_value = mock_completion
-
+        with patch("app.services.llm_service.AsyncOpenAI", return_value=FakeOpenAIClient(tool_reply("Invalid JSON response"))):
             # Should raise HTTPException
             with pytest.raises(HTTPException) as exc_info:
                 await LLMService._generate_with_openai(
@@ -274,16 +369,32 @@ class TestMockedLLMGeneration:
 
             assert exc_info.value.status_code == 500
 
+    @pytest.mark.asyncio
+    async def test_openai_generation_missing_cards_field(self):
+        """Test OpenAI generation with a JSON reply that has no cards"""
+        with patch("app.services.llm_service.AsyncOpenAI", return_value=FakeOpenAIClient(tool_reply({"flashcards": []}))):
+            with pytest.raises(HTTPException) as exc_info:
+                await LLMService._generate_with_openai(
+                    content="Test content",
+                    num_cards=5,
+                    api_key="test-key"
+                )
+
+            assert exc_info.value.status_code == 500
+            assert exc_info.value.detail == "Failed to parse LLM response. Please try again."
+
     @pytest.mark.asyncio
     async def test_ollama_timeout_handling(self):
         """Test that Ollama timeout is handled properly"""
         import httpx
+        from app.services import llm_service as llm_module
 
-        with patch("httpx.AsyncClient") as mock_client_class:
+        with patch("app.services.llm_service._http_client") as mock_http_client, \
+                patch("app.services.llm_service.asyncio.sleep", new=AsyncMock()) as sleep:
             # Setup mock to raise timeout
             mock_client = AsyncMock()
-            mock_client_class.return_value.__aenter__.return_value = mock_client
-            mock_client.post.side_effect = httpx.TimeoutException("Request timed out")
+            mock_http_client.return_value = mock_client
+            mock_client.stream = MagicMock(side_effect=httpx.PoolTimeout("Request timed out"))
 
             # Should raise HTTPException with 504 status
             with pytest.raises(HTTPException) as exc_info:
@@ -294,6 +405,191 @@ class TestMockedLLMGeneration:
 
             assert exc_info.value.status_code == 504
             assert "timed out" in exc_info.value.detail.lower()
+            # Every attempt timed out before any output, so each was retried
+            assert mock_client.stream.call_count == llm_module.OLLAMA_MAX_RETRIES + 1
+            assert sleep.await_count == llm_module.OLLAMA_MAX_RETRIES
+
+    @pytest.mark.asyncio
+    async def test_ollama_generation_read_timeout_is_not_retried(self):
+        """Test that a generation that timed out reading fails without running again"""
+        import httpx
+
+        with patch("app.services.llm_service._http_client") as mock_http_client, \
+                patch("app.services.llm_service.asyncio.sleep", new=AsyncMock()) as sleep:
+            mock_client = AsyncMock()
+            mock_http_client.return_value = mock_client
+            mock_client.stream = MagicMock(side_effect=httpx.ReadTimeout("Read timed out"))
+
+            with pytest.raises(HTTPException) as exc_info:
+                await LLMService._generate_with_ollama(content="Test content", num_cards=5)
+
+        assert exc_info.value.status_code == 504
+        mock_client.stream.assert_called_once()
+        sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_ollama_generation_retries_server_errors(self):
+        """Test that a 503 from Ollama is retried before any output is streamed"""
+        from contextlib import asynccontextmanager
+
+        payload = json.dumps({"cards": [{"type": "basic", "prompt": "What is AI?", "answer": "Artificial Intelligence"}]})
+
+        async def aiter_lines():
+            yield json.dumps({"message": {"content": payload}, "done": True})
+
+        replies = [
+            MagicMock(status_code=503, aread=AsyncMock(return_value=b"loading model")),
+            MagicMock(status_code=200, aiter_lines=aiter_lines),
+        ]
+
+        @asynccontextmanager
+        async def fake_stream(method, url, **kwargs):
+            yield replies.pop(0)
+
+        with patch("app.services.llm_service._http_client") as mock_http_client, \
+                patch("app.services.llm_service.asyncio.sleep", new=AsyncMock()) as sleep:
+            mock_http_client.return_value = MagicMock(stream=fake_stream)
+            cards = await LLMService._generate_with_ollama(content="Test content", num_cards=1)
+
+        assert [c["prompt"] for c in cards] == ["What is AI?"]
+        assert not replies
+        sleep.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_ollama_stream_is_not_retried_after_output(self):
+        """Test that a timeout mid-stream fails instead of repeating output"""
+        import httpx
+        from contextlib import asynccontextmanager
+
+        async def aiter_lines():
+            yield json.dumps({"message": {"content": '{"cards": ['}, "done": False})
+            raise httpx.ReadTimeout("Read timed out")
+
+        stream = MagicMock()
+
+        @asynccontextmanager
+        async def fake_stream(method, url, **kwargs):
+            stream()
+            yield MagicMock(status_code=200, aiter_lines=aiter_lines)
+
+        with patch("app.services.llm_service._http_client") as mock_http_client:
+            mock_http_client.return_value = MagicMock(stream=fake_stream)
+            with pytest.raises(HTTPException) as exc_info:
+                async for _ in LLMService._stream_ollama(content="Test content", num_cards=1):
+                    pass
+
+        assert exc_info.value.status_code == 504
+        stream.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_ollama_answer_check_retries_rate_limit(self):
+        """Test that the non-streamed answer check retries a 429 from Ollama"""
+        verdict = json.dumps({"is_correct": True, "feedback": "Correct"})
+        mock_client = MagicMock(post=AsyncMock(side_effect=[
+            MagicMock(status_code=429, text="busy"),
+            MagicMock(status_code=200, content=orjson.dumps({"message": {"content": verdict}})),
+        ]))
+
+        with patch("app.services.llm_service._http_client", return_value=mock_client), \
+                patch("app.services.llm_service.asyncio.sleep", new=AsyncMock()):
+            result = await LLMService._check_answer_with_ollama("Q?", "A", "A")
+
+        assert result == {"is_correct": True, "feedback": "Correct"}
+        assert mock_client.post.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_ollama_answer_check_retries_read_timeout(self):
+        """Test that the short answer check retries a read timeout"""
+        import httpx
+
+        verdict = json.dumps({"is_correct": False, "feedback": "Not quite"})
+        mock_client = MagicMock(post=AsyncMock(side_effect=[
+            httpx.ReadTimeout("Read timed out"),
+            MagicMock(status_code=200, content=orjson.dumps({"message": {"content": verdict}})),
+        ]))
+
+        with patch("app.services.llm_service._http_client", return_value=mock_client), \
+                patch("app.services.llm_service.asyncio.sleep", new=AsyncMock()):
+            result = await LLMService._check_answer_with_ollama("Q?", "A", "B")
+
+        assert result == {"is_correct": False, "feedback": "Not quite"}
+        assert mock_client.post.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_ollama_generation_assembles_streamed_reply(self):
+        """Test that Ollama generation joins the streamed message chunks"""
+        from contextlib import asynccontextmanager
+
+        payload = json.dumps({"cards": [{"type": "basic", "prompt": "What is AI?", "answer": "Artificial Intelligence"}]})
+        lines = [
+            json.dumps({"message": {"content": payload[i:i + 8]}, "done": False})
+            for i in range(0, len(payload), 8)
+        ] + [json.dumps({"message": {"content": ""}, "done": True})]
+
+        async def aiter_lines():
+            for line in lines:
+                yield line
+
+        @asynccontextmanager
+        async def fake_stream(method, url, **kwargs):
+            body = orjson.loads(kwargs["content"])
+            assert body["stream"] is True
+            assert body["options"]["num_ctx"] == LLMService.OLLAMA_NUM_CTX
+            yield MagicMock(status_code=200, aiter_lines=aiter_lines)
+
+        with patch("app.services.llm_service._http_client") as mock_http_client:
+            mock_http_client.return_value = MagicMock(stream=fake_stream)
+            cards = await LLMService._generate_with_ollama(content="Test content", num_cards=1)
+
+        assert [c["prompt"] for c in cards] == ["What is AI?"]
+
+    @pytest.mark.asyncio
+    async def test_ollama_status_is_cached(self):
+        """Test that repeated availability checks share one probe"""
+        from app.services import llm_service as llm_module
+
+        llm_module._ollama_status_cache.clear()
+        with patch("app.services.llm_service._http_client") as mock_http_client:
+            mock_client = AsyncMock()
+            mock_http_client.return_value = mock_client
+            mock_client.head.return_value = MagicMock(status_code=200)
+
+            assert await LLMService.check_ollama_availability() is True
+            assert await LLMService.check_ollama_availability() is True
+
+        assert mock_client.head.call_count == 1
+        llm_module._ollama_status_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_http_client_is_shared_and_closed(self):
+        """Test that Ollama calls reuse one client until shutdown"""
+        from app.services.llm_service import _http_client, close_http_client
+
+        client = _http_client()
+        assert _http_client() is client
+
+        await close_http_client()
+        assert client.is_closed
+        assert _http_client() is not client
+        await close_http_client()
+
+    @pytest.mark.asyncio
+    async def test_openai_clients_are_reused_per_key(self):
+        """Test that OpenAI clients are memoized per key and share one pool"""
+        from app.services import llm_service
+        from app.services.llm_service import _openai_client, _openai_http_client, close_http_client
+
+        client = _openai_client("key-a")
+        assert _openai_client("key-a") is client
+        assert _openai_client("key-b") is not client
+        assert client._client is _openai_client("key-b")._client is _openai_http_client()
+        assert client.max_retries == llm_service.OPENAI_MAX_RETRIES
+
+        pool = _openai_http_client()
+        await close_http_client()
+        assert pool.is_closed
+        assert _openai_client("key-a") is not client
+        await close_http_client()
 
     @pytest.mark.asyncio
     async def test_card_type_defaults_to_basic(self):
@@ -309,15 +605,7 @@ class TestMockedLLMGeneration:
             ]
         }
 
-        with patch("app.services.llm_service.AsyncOpenAI") as mock_openai:
-            mock_client = AsyncMock()
-            mock_openai.return_value = mock_client
-            mock_completion = AsyncMock()
-            mock_completion.choices = [
-                MagicMock(message=MagicMock(content=json.dumps(mock_response)))
-            ]
-            mock_client.chat.completions.create.return_value = mock_completion
-
+        with patch("app.services.llm_service.AsyncOpenAI", return_value=FakeOpenAIClient(tool_reply(mock_response))):
             result = await LLMService._generate_with_openai(
                 content="Test content",
                 num_cards=1,
@@ -347,15 +635,7 @@ class TestMockedLLMGeneration:
             ]
         }
 
-        with patch("app.services.llm_service.AsyncOpenAI") as mock_openai:
-            mock_client = AsyncMock()
-            mock_openai.return_value = mock_client
-            mock_completion = AsyncMock()
-            mock_completion.choices = [
-                MagicMock(message=MagicMock(content=json.dumps(mock_response)))
-            ]
-            mock_client.chat.completions.create.return_value = mock_completion
-
+        with patch("app.services.llm_service.AsyncOpenAI", return_value=FakeOpenAIClient(tool_reply(mock_response))):
             result = await LLMService._generate_with_openai(
                 content="Test content",
                 num_cards=2,
@@ -366,6 +646,277 @@ class TestMockedLLMGeneration:
             assert len(result) == 1
             assert result[0]["type"] == "basic"
 
+    @pytest.mark.asyncio
+    async def test_batched_generation_merges_and_dedupes(self):
+        """Test that concurrent batches are merged without duplicate prompts"""
+        def completion(cards):
+            mock_completion = AsyncMock()
+            mock_completion.choices = [
+                tool_reply({"cards": cards})
+            ]
+            return mock_completion
+
+        batch = [
+            {"type": "basic", "prompt": "Shared question?", "answer": "Yes"},
+            {"type": "basic", "prompt": "Unique question?", "answer": "Yes"},
+        ]
+
+        with patch("app.services.llm_service.AsyncOpenAI") as mock_openai:
+            mock_client = AsyncMock()
+            mock_openai.return_value = mock_client
+            mock_client.chat.completions.create.side_effect = [
+                completion(batch),
+                completion([batch[0], {"type": "basic", "prompt": "Other?", "answer": "No"}]),
+            ]
+
+            user = MagicMock(id=1, openai_api_key="test-key", llm_provider_preference="openai")
+            result = await LLMService.generate_flashcards("x" * 5000, num_cards=5, user=user)
+
+        assert mock_client.chat.completions.create.call_count == 2
+        assert [c["prompt"] for c in result] == ["Shared question?", "Unique question?", "Other?"]
+
+    @pytest.mark.asyncio
+    async def test_repeated_generation_is_cached(self):
+        """Test that identical generation requests reuse the first result"""
+        mock_completion = AsyncMock()
+        mock_completion.choices = [tool_reply({
+            "cards": [{"type": "basic", "prompt": f"Q{i}?", "answer": "A"} for i in range(5)]
+        })]
+
+        with patch("app.services.llm_service.AsyncOpenAI") as mock_openai:
+            mock_client = AsyncMock()
+            mock_openai.return_value = mock_client
+            mock_client.chat.completions.create.return_value = mock_completion
+
+            user = MagicMock(id=1, openai_api_key="test-key", llm_provider_preference="openai")
+            first = await LLMService.generate_flashcards("x" * 100, num_cards=5, user=user)
+            second = await LLMService.generate_flashcards("x" * 100, num_cards=5, user=user)
+            await LLMService.generate_flashcards("y" * 100, num_cards=5, user=user)
+
+        assert second == first
+        assert mock_client.chat.completions.create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_generation_is_copied(self):
+        """Test that editing returned cards doesn't change what the cache returns later"""
+        mock_completion = AsyncMock()
+        mock_completion.choices = [tool_reply({
+            "cards": [
+                {"type": "multiple_choice", "prompt": f"Q{i}?", "answer": "A", "options": ["A", "B"]}
+                for i in range(5)
+            ]
+        })]
+
+        with patch("app.services.llm_service.AsyncOpenAI") as mock_openai:
+            mock_client = AsyncMock()
+            mock_openai.return_value = mock_client
+            mock_client.chat.completions.create.return_value = mock_completion
+
+            user = MagicMock(id=1, openai_api_key="test-key", llm_provider_preference="openai")
+            first = await LLMService.generate_flashcards("x" * 100, num_cards=5, user=user)
+            first[0]["prompt"] = "Edited?"
+            first[0]["options"].append("C")
+            second = await LLMService.generate_flashcards("x" * 100, num_cards=5, user=user)
+            second.pop()
+            third = await LLMService.generate_flashcards("x" * 100, num_cards=5, user=user)
+
+        assert third[0]["prompt"] == "Q0?"
+        assert third[0]["options"] == ["A", "B"]
+        assert len(third) == 5
+        assert mock_client.chat.completions.create.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_repeated_answer_check_is_cached(self):
+        """Test that identical answer checks reuse the first verdict"""
+        mock_completion = AsyncMock()
+        mock_completion.choices = [MagicMock(message=MagicMock(content=json.dumps({
+            "is_correct": True, "feedback": "Correct"
+        })))]
+
+        with patch("app.services.llm_service.AsyncOpenAI") as mock_openai:
+            mock_client = AsyncMock()
+            mock_openai.return_value = mock_client
+            mock_client.chat.completions.create.return_value = mock_completion
+
+            user = MagicMock(id=1, openai_api_key="test-key", llm_provider_preference="openai")
+            first = await LLMService.check_answer("Capital of France?", "Paris", "paris", user)
+            second = await LLMService.check_answer("Capital of France?", "Paris", "  Paris. ", user)
+            await LLMService.check_answer("Capital of France?", "Paris", "Lyon", user)
+
+        assert first is not None
+        assert second == first
+        assert mock_client.chat.completions.create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_generation_is_rate_limited_per_user(self):
+        """Test that generation over the per-user allowance is rejected before calling the LLM"""
+        from app.core.rate_limit import TokenBucket
+
+        mock_completion = AsyncMock()
+        mock_completion.choices = [tool_reply({
+            "cards": [{"type": "basic", "prompt": f"Q{i}?", "answer": "A"} for i in range(5)]
+        })]
+
+        with patch("app.services.llm_service._generation_limiter", TokenBucket(2, 3600)), \
+                patch("app.services.llm_service.AsyncOpenAI") as mock_openai:
+            mock_client = AsyncMock()
+            mock_openai.return_value = mock_client
+            mock_client.chat.completions.create.return_value = mock_completion
+
+            user = MagicMock(id=1, openai_api_key="test-key", llm_provider_preference="openai")
+            other = MagicMock(id=2, openai_api_key="test-key", llm_provider_preference="openai")
+            await LLMService.generate_flashcards("a" * 100, num_cards=5, user=user)
+            await LLMService.generate_flashcards("b" * 100, num_cards=5, user=user)
+            # Cached results don't count against the limit
+            await LLMService.generate_flashcards("a" * 100, num_cards=5, user=user)
+            with pytest.raises(HTTPException) as exc_info:
+                await LLMService.generate_flashcards("c" * 100, num_cards=5, user=user)
+            await LLMService.generate_flashcards("c" * 100, num_cards=5, user=other)
+
+        assert exc_info.value.status_code == 429
+        assert mock_client.chat.completions.create.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_answer_checks_over_limit_fall_back(self):
+        """Test that answer checks over the per-user allowance skip the LLM"""
+        from app.core.rate_limit import TokenBucket
+
+        mock_completion = AsyncMock()
+        mock_completion.choices = [MagicMock(message=MagicMock(content=json.dumps({
+            "is_correct": True, "feedback": "Correct"
+        })))]
+
+        with patch("app.services.llm_service._answer_check_limiter", TokenBucket(1, 60)), \
+                patch("app.services.llm_service.AsyncOpenAI") as mock_openai:
+            mock_client = AsyncMock()
+            mock_openai.return_value = mock_client
+            mock_client.chat.completions.create.return_value = mock_completion
+
+            user = MagicMock(id=1, openai_api_key="test-key", llm_provider_preference="openai")
+            assert await LLMService.check_answer("Capital of France?", "Paris", "Paris", user) is not None
+            assert await LLMService.check_answer("Capital of Spain?", "Madrid", "Madrid", user) is None
+
+        assert mock_client.chat.completions.create.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_openai_requests_are_bounded(self):
+        """Test that concurrent OpenAI calls never exceed the configured cap"""
+        from app.services import llm_service
+
+        in_flight = peak = 0
+
+        async def create(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            mock_completion = MagicMock()
+            mock_completion.choices = [tool_reply({
+                "cards": [{"type": "basic", "prompt": f"Q{id(kwargs)}-{i}?", "answer": "A"} for i in range(4)]
+            })]
+            return mock_completion
+
+        with patch("app.services.llm_service.OPENAI_MAX_CONCURRENT_REQUESTS", 2), \
+                patch("app.services.llm_service.AsyncOpenAI") as mock_openai:
+            mock_client = AsyncMock()
+            mock_openai.return_value = mock_client
+            mock_client.chat.completions.create.side_effect = create
+
+            user = MagicMock(id=1, openai_api_key="test-key", llm_provider_preference="openai")
+            await LLMService.generate_flashcards("x" * 5000, num_cards=20, user=user)
+
+        assert mock_client.chat.completions.create.call_count == 5
+        assert peak == 2
+
+    def test_openai_slots_are_per_event_loop(self):
+        """Test that each event loop gets its own semaphore instead of the first loop's"""
+        from app.services.llm_service import _openai_slots
+
+        async def acquire():
+            slots = _openai_slots()
+            async with slots:
+                return slots
+
+        assert asyncio.run(acquire()) is not asyncio.run(acquire())
+
+
+class TestStreamingGeneration:
+    """Test incremental card streaming"""
+
+    def test_parser_emits_cards_split_across_chunks(self):
+        """Test that cards are emitted once their closing brace arrives"""
+        from app.services.llm_service import _CardStreamParser
+
+        payload = json.dumps({
+            "cards": [
+                {"type": "basic", "prompt": "What is {x}?", "answer": "A \"brace\" }"},
+                {"type": "short_answer", "prompt": "Why?", "answer": "Because"}
+            ]
+        })
+        parser = _CardStreamParser()
+        cards = []
+        for i in range(0, len(payload), 7):
+            cards.extend(parser.feed(payload[i:i + 7]))
+
+        assert [c["prompt"] for c in cards] == ["What is {x}?", "Why?"]
+        assert cards[0]["answer"] == 'A "brace" }'
+
+    @pytest.mark.asyncio
+    async def test_openai_stream_yields_validated_cards(self):
+        """Test streamed OpenAI output is parsed and validated card by card"""
+        payload = json.dumps({
+            "cards": [
+                {"type": "basic", "prompt": "What is AI?", "answer": "Artificial Intelligence"},
+                {"type": "multiple_choice", "prompt": "Pick one", "answer": "A", "options": ["A"]},
+                {"prompt": "No type?", "answer": "Defaults to basic"}
+            ]
+        })
+
+        async def fake_stream():
+            for i in range(0, len(payload), 10):
+                tool_call = MagicMock(function=MagicMock(arguments=payload[i:i + 10]))
+                yield MagicMock(choices=[MagicMock(delta=MagicMock(content=None, tool_calls=[tool_call]))])
+
+        with patch("app.services.llm_service.AsyncOpenAI") as mock_openai:
+            mock_client = AsyncMock()
+            mock_openai.return_value = mock_client
+            mock_client.chat.completions.create.return_value = fake_stream()
+
+            user = MagicMock(id=1, openai_api_key="test-key", llm_provider_preference="openai")
+            cards = await LLMService.stream_flashcards("x" * 100, num_cards=5, user=user)
+            result = [card async for card in cards]
+
+        assert [c["prompt"] for c in result] == ["What is AI?", "No type?"]
+        assert result[1]["type"] == "basic"
+        kwargs = mock_client.chat.completions.create.call_args.kwargs
+        assert kwargs["stream"] is True
+        assert kwargs["tool_choice"]["function"]["name"] == "submit_flashcards"
+
+    def test_stream_endpoint_returns_ndjson(self, client, test_user_token):
+        """Test the streaming endpoint writes one card per line"""
+        cards = [
+            {"type": "basic", "prompt": "Q1", "answer": "A1", "explanation": None},
+            {"type": "basic", "prompt": "Q2", "answer": "A2", "explanation": None},
+        ]
+
+        async def fake_cards():
+            for card in cards:
+                yield card
+
+        with patch("app.api.routes.ai_decks.file_parser_service.parse_file", AsyncMock(return_value="x" * 100)), \
+                patch("app.api.routes.ai_decks.llm_service.stream_flashcards", AsyncMock(return_value=fake_cards())):
+            response = client.post(
+                "/api/v1/ai-decks/generate-from-file/stream",
+                files={"file": ("notes.txt", b"content", "text/plain")},
+                data={"num_cards": "5"},
+                headers={"Authorization": f"Bearer {test_user_token}"},
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert [json.loads(line) for line in response.text.splitlines()] == cards
+
 
 class TestCardTypeMixing:
     """Test that generated cards have proper type distribution"""
@@ -420,7 +971,7 @@ class TestCardTypeMixing:
                 assert len(card["options"]) >= 2
                 assert card["answer"] in card["options"]
             elif card["type"] == "cloze":
-                assert "[BLANK]" in card["prompt"].upper()
+                assert _BLANK_RE.search(card["prompt"])
                 assert "cloze_data" in card
 
 
@@ -469,13 +1020,82 @@ class TestAPIValidation:
         }
 
         # Should pass validation
-        assert "[BLANK]" in card["prompt"].upper()
+        assert _BLANK_RE.search(card["prompt"])
         assert "cloze_data" in card
         assert card["cloze_data"]["blanks"]
 
 
-# Integration test markers
-pytestmark = pytest.mark.asyncio
+class TestCreateDeckFromGeneratedCards:
+    """Test POST /api/v1/ai-decks/create-deck"""
+
+    def _post(self, client, token, cards):
+        return client.post(
+            "/api/v1/ai-decks/create-deck",
+            json={"title": "Generated", "cards": cards},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    def test_cloze_blanks_are_case_insensitive(self, client, test_user_token):
+        """Test that [blank] markers are counted regardless of case"""
+        card = {
+            "type": "cloze",
+            "prompt": "[BLANK] was created by [blank].",
+            "answer": "Python, Guido",
+            "cloze_data": {"blanks": [{"answer": "Python"}, {"answer": "Guido"}]},
+        }
+        response = self._post(client, test_user_token, [card])
+        assert response.status_code == 200
+        assert len(response.json()["cards"]) == 1
+
+    def test_cloze_blank_count_mismatch_rejected(self, client, test_user_token):
+        """Test that the number of [BLANK]s must match cloze_data"""
+        card = {
+            "type": "cloze",
+            "prompt": "Python was created by [BLANK].",
+            "answer": "Guido, 1991",
+            "cloze_data": {"blanks": [{"answer": "Guido"}, {"answer": "1991"}]},
+        }
+        response = self._post(client, test_user_token, [card])
+        assert response.status_code == 422
+        assert "Number of [BLANK]s (1)" in response.text
+
+    def test_cloze_without_blank_rejected(self, client, test_user_token):
+        """Test that cloze prompts need at least one [BLANK]"""
+        card = {
+            "type": "cloze",
+            "prompt": "Python was created by Guido.",
+            "answer": "Guido",
+            "cloze_data": {"blanks": [{"answer": "Guido"}]},
+        }
+        response = self._post(client, test_user_token, [card])
+        assert response.status_code == 422
+
+    def test_missing_type_defaults_to_basic(self, client, test_user_token):
+        """Test that cards without a type are created as basic cards"""
+        response = self._post(client, test_user_token, [{"prompt": "  Q?  ", "answer": "A"}])
+        assert response.status_code == 200
+        card = response.json()["cards"][0]
+        assert card["type"] == "basic"
+        assert card["prompt"] == "Q?"
+
+    def test_multiple_choice_answer_must_be_an_option(self, client, test_user_token):
+        """Test that multiple choice answers are checked against the options"""
+        card = {"type": "multiple_choice", "prompt": "Q?", "answer": "C", "options": ["A", "B"]}
+        response = self._post(client, test_user_token, [card])
+        assert response.status_code == 422
+        assert "Answer must be one of the options" in response.text
+
+    def test_whitespace_is_stripped_before_option_check(self, client, test_user_token):
+        """Test that padded answers still match their option"""
+        card = {"type": "multiple_choice", "prompt": "Q?", "answer": " B ", "options": ["A", "B  "]}
+        response = self._post(client, test_user_token, [card])
+        assert response.status_code == 200
+        assert response.json()["cards"][0]["answer"] == "B"
+
+    def test_blank_prompt_and_unknown_type_rejected(self, client, test_user_token):
+        """Test that empty prompts and unknown card types fail validation"""
+        assert self._post(client, test_user_token, [{"prompt": "   ", "answer": "A"}]).status_code == 422
+        assert self._post(client, test_user_token, [{"type": "essay", "prompt": "Q", "answer": "A"}]).status_code == 422
 
 
 if __name__ == "__main__":
@@ -1,4 +1,6 @@
 """Tests for authentication API endpoints."""
+from unittest.mock import patch
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session
@@ -117,6 +119,146 @@ class TestGetCurrentUser:
         )
         assert response.status_code == 401
 
+    def test_reused_token_is_decoded_once(self, client: TestClient, test_user: User, test_user_token):
+        from app.api import deps
+
+        deps._token_cache.clear()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        with patch("app.api.deps.decode_token", wraps=deps.decode_token) as decode:
+            assert client.get("/api/v1/me", headers=headers).status_code == 200
+            assert client.get("/api/v1/me", headers=headers).status_code == 200
+        assert decode.call_count == 1
+
+    def test_invalid_token_is_not_cached(self, client: TestClient):
+        from app.api import deps
+
+        deps._token_cache.clear()
+        headers = {"Authorization": "Bearer invalid_token"}
+        assert client.get("/api/v1/me", headers=headers).status_code == 401
+        assert len(deps._token_cache) == 0
+
+    def test_cached_user_is_invalidated_on_update(self, client: TestClient, test_user: User, test_user_token):
+        from app.api import deps
+
+        deps._user_cache.clear()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        assert client.get("/api/v1/me", headers=headers).status_code == 200
+        assert deps._user_cache.get(test_user.id) is not None
+
+        response = client.get("/api/v1/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["email"] == test_user.email
+
+        response = client.put(
+            "/api/v1/me/password",
+            json={"current_password": "testpassword123", "new_password": "anotherpassword789"},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        assert deps._user_cache.get(test_user.id) is None
+
+    def test_cached_user_snapshot_excludes_secrets(self, db: Session, test_user: User):
+        from app.api import deps
+
+        test_user.openai_api_key = "sk-secret"
+        db.commit()
+        deps._user_cache.clear()
+        deps._load_user(db, test_user.id)
+
+        snapshot = deps._user_cache.get(test_user.id)
+        assert snapshot["email"] == test_user.email
+        assert "hashed_password" not in snapshot
+        assert "openai_api_key" not in snapshot
+
+        # A cache hit still reads the secrets from the row when asked
+        db.expunge_all()
+        user = deps._load_user(db, test_user.id)
+        assert user.openai_api_key == "sk-secret"
+        assert user.hashed_password.startswith("$argon2")
+
+    def test_llm_user_has_secrets_loaded_off_the_event_loop(self, db: Session, test_user: User):
+        from sqlalchemy import inspect
+
+        from app.api import deps
+
+        deps._user_cache.clear()
+        deps._load_user(db, test_user.id)
+        db.expunge_all()
+        user = deps._load_user(db, test_user.id)
+        assert {"hashed_password", "openai_api_key"} <= inspect(user).unloaded
+
+        # The sync dependency runs in the threadpool, so async LLM code reads no unloaded columns
+        assert deps.get_current_llm_user(user) is user
+        assert not {"hashed_password", "openai_api_key"} & inspect(user).unloaded
+
+    def test_cached_user_is_invalidated_on_commit_not_flush(self, db: Session, test_user: User):
+        from app.api import deps
+
+        deps._user_cache.clear()
+        user = deps._load_user(db, test_user.id)
+        user.is_active = False
+        db.flush()
+        assert deps._user_cache.get(test_user.id) is not None
+
+        db.commit()
+        assert deps._user_cache.get(test_user.id) is None
+
+    def test_user_loaded_during_a_commit_is_not_cached(self, db: Session, test_user: User):
+        from app.api import deps
+
+        deps._user_cache.clear()
+        db.expunge_all()
+        real_get = db.get
+
+        def get_while_user_changes(model, ident):
+            user = real_get(model, ident)
+            # Another request demotes the user while this load is in flight
+            user.role = UserRole.USER
+            user.is_active = False
+            db.commit()
+            return user
+
+        with patch.object(db, "get", side_effect=get_while_user_changes):
+            deps._load_user(db, test_user.id)
+        assert deps._user_cache.get(test_user.id) is None
+
+
+@pytest.mark.unit
+class TestUserDependencies:
+    """Test the active/admin user dependencies."""
+
+    def test_active_user_passes(self, test_user: User):
+        from app.api.deps import get_current_active_user
+
+        assert get_current_active_user(current_user=test_user) is test_user
+
+    def test_inactive_user_rejected(self, test_user: User):
+        from fastapi import HTTPException
+        from app.api.deps import get_current_active_user
+
+        test_user.is_active = False
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_active_user(current_user=test_user)
+        assert exc_info.value.status_code == 400
+
+    def test_admin_required(self, test_user: User, admin_user: User):
+        from fastapi import HTTPException
+        from app.api.deps import get_current_admin
+
+        assert get_current_admin(current_user=admin_user) is admin_user
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_admin(current_user=test_user)
+        assert exc_info.value.status_code == 403
+
+    def test_inactive_admin_rejected(self, admin_user: User):
+        from fastapi import HTTPException
+        from app.api.deps import get_current_admin
+
+        admin_user.is_active = False
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_admin(current_user=admin_user)
+        assert exc_info.value.status_code == 400
+
 
 @pytest.mark.integration
 class TestChangePassword:
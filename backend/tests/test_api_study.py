@@ -191,6 +191,39 @@ class TestSubmitAnswer:
         data = response.json()
         assert data["is_correct"] is True
 
+    def test_llm_graded_answer_loads_api_key_before_grading(
+        self, client: TestClient, quiz_session, test_cards, test_user, test_user_token, db
+    ):
+        from unittest.mock import patch
+
+        from sqlalchemy import inspect
+
+        from app.api import deps
+
+        quiz_session.mode = QuizMode.PRACTICE
+        db.add(quiz_session)
+        db.commit()
+        card_id, session_id = test_cards[1].id, quiz_session.id
+        deps._user_cache.clear()
+        deps._load_user(db, test_user.id)
+        db.expunge_all()
+
+        unloaded_when_graded = []
+
+        async def check_answer_with_llm(card, user_answer, user):
+            unloaded_when_graded.append(inspect(user).unloaded)
+            return None
+
+        with patch("app.services.study._check_answer_with_llm", side_effect=check_answer_with_llm):
+            response = client.post(
+                f"/api/v1/study/sessions/{session_id}/answer",
+                json={"card_id": card_id, "user_answer": "Paris"},
+                headers={"Authorization": f"Bearer {test_user_token}"},
+            )
+        assert response.status_code == 200
+        # The key was read in the threadpool, so grading on the event loop triggers no SELECT
+        assert "openai_api_key" not in unloaded_when_graded[0]
+
     def test_submit_answer_no_auth(self, client: TestClient, quiz_session, test_cards):
         card = test_cards[0]
         payload = {"card_id": card.id, "user_answer": "4", "quality": 4}
@@ -198,6 +231,68 @@ class TestSubmitAnswer:
         assert response.status_code == 401
 
 
+@pytest.mark.integration
+class TestSubmitAnswers:
+    """Test POST /api/v1/study/sessions/{session_id}/answers endpoint."""
+
+    def test_submit_answers_in_one_request(self, client: TestClient, quiz_session, test_cards, test_user_token, db):
+        from sqlmodel import select
+        from app.models import SRSReview
+
+        answers = [
+            {"card_id": test_cards[0].id, "user_answer": "4", "quality": 4},
+            {"card_id": test_cards[1].id, "user_answer": "Paris", "quality": 2},
+            {"card_id": test_cards[0].id, "user_answer": "4", "quality": 5},
+        ]
+        response = client.post(
+            f"/api/v1/study/sessions/{quiz_session.id}/answers",
+            json={"answers": answers},
+            headers={"Authorization": f"Bearer {test_user_token}"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [(a["card_id"], a["quality"]) for a in data] == [(a["card_id"], a["quality"]) for a in answers]
+        assert all(a["id"] and a["responded_at"] for a in data)
+
+        review = db.exec(
+            select(SRSReview).where(SRSReview.user_id == quiz_session.user_id, SRSReview.card_id == test_cards[0].id)
+        ).one()
+        assert review.repetitions == 2
+
+    def test_submit_answers_grades_practice_answers(self, client: TestClient, quiz_session, test_cards, test_user_token, db):
+        quiz_session.mode = QuizMode.PRACTICE
+        db.add(quiz_session)
+        db.commit()
+
+        response = client.post(
+            f"/api/v1/study/sessions/{quiz_session.id}/answers",
+            json={"answers": [
+                {"card_id": test_cards[0].id, "user_answer": "4"},
+                {"card_id": test_cards[0].id, "user_answer": "5"},
+            ]},
+            headers={"Authorization": f"Bearer {test_user_token}"},
+        )
+        assert response.status_code == 200
+        assert [a["is_correct"] for a in response.json()] == [True, False]
+
+    def test_submit_answers_rejects_card_outside_deck(self, client: TestClient, quiz_session, test_cards, test_user_token):
+        response = client.post(
+            f"/api/v1/study/sessions/{quiz_session.id}/answers",
+            json={"answers": [
+                {"card_id": test_cards[0].id, "user_answer": "4", "quality": 4},
+                {"card_id": 99999, "user_answer": "4", "quality": 4},
+            ]},
+            headers={"Authorization": f"Bearer {test_user_token}"},
+        )
+        assert response.status_code == 404
+
+        stats = client.get(
+            f"/api/v1/study/sessions/{quiz_session.id}/statistics",
+            headers={"Authorization": f"Bearer {test_user_token}"},
+        )
+        assert stats.json()["total_responses"] == 0
+
+
 @pytest.mark.integration
 class TestDueReviews:
     """Test GET /api/v1/study/reviews/due endpoint."""
@@ -0,0 +1,203 @@
+"""Tests for the upload file parser service."""
+import io
+from unittest.mock import patch
+
+import pytest
+from docx import Document
+from fastapi import HTTPException, UploadFile
+from pptx import Presentation
+from pptx.enum.shapes import MSO_CONNECTOR
+from pptx.util import Inches
+
+from app.services.file_parser import FileParserService
+
+
+def make_upload(filename: str, content: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+
+def make_pdf(pages: list[str]) -> bytes:
+    """Build a minimal PDF with one line of Helvetica text per page."""
+    font_id = 3 + 2 * len(pages)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>",
+    ]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for num, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n{obj}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+@pytest.mark.unit
+class TestParseFile:
+    """Test parsing uploaded files."""
+
+    @pytest.mark.asyncio
+    async def test_parse_txt(self):
+        upload = make_upload("notes.txt", "  Photosynthesis converts light into energy.  \n".encode("utf-8"))
+        assert await FileParserService.parse_file(upload) == "Photosynthesis converts light into energy."
+
+    @pytest.mark.asyncio
+    async def test_parse_txt_latin1_fallback(self):
+        upload = make_upload("notes.txt", "Café au lait".encode("latin-1"))
+        assert await FileParserService.parse_file(upload) == "Café au lait"
+
+    @pytest.mark.asyncio
+    async def test_zero_byte_txt_fails(self):
+        with pytest.raises(HTTPException) as exc_info:
+            await FileParserService.parse_file(make_upload("empty.txt", b""))
+        assert exc_info.value.status_code == 500
+        assert "empty" in exc_info.value.detail
+
+    @pytest.mark.asyncio
+    async def test_parse_pdf(self):
+        upload = make_upload("slides.pdf", make_pdf(["Hello page one", "", "Third page text"]))
+        assert await FileParserService.parse_file(upload) == (
+            "--- Page 1 ---\nHello page one\n\n--- Page 3 ---\nThird page text"
+        )
+
+    @pytest.mark.asyncio
+    async def test_parse_docx(self):
+        document = Document()
+        document.add_paragraph("First paragraph")
+        document.add_paragraph("   ")
+        document.add_paragraph("Second paragraph")
+        buffer = io.BytesIO()
+        document.save(buffer)
+
+        upload = make_upload("notes.docx", buffer.getvalue())
+        assert await FileParserService.parse_file(upload) == "First paragraph\n\nSecond paragraph"
+
+    @pytest.mark.asyncio
+    async def test_parse_docx_matches_python_docx_text(self):
+        from docx.enum.text import WD_BREAK
+
+        document = Document()
+        document.add_paragraph("Term\tDefinition")
+        paragraph = document.add_paragraph("Line one")
+        paragraph.add_run().add_break()
+        paragraph.add_run("Line two")
+        paragraph.add_run().add_break(WD_BREAK.PAGE)
+        bold = document.add_paragraph().add_run("Bold words")
+        bold.bold = True
+        buffer = io.BytesIO()
+        document.save(buffer)
+
+        expected = "\n\n".join(p.text for p in document.paragraphs)
+        upload = make_upload("notes.docx", buffer.getvalue())
+        assert await FileParserService.parse_file(upload) == expected
+        assert expected == "Term\tDefinition\n\nLine one\nLine two\n\nBold words"
+
+    @pytest.mark.asyncio
+    async def test_parse_pptx(self):
+        presentation = Presentation()
+        layout = presentation.slide_layouts[6]  # blank
+        first = presentation.slides.add_slide(layout)
+        for text in ("Title text", "  ", "Body text"):
+            first.shapes.add_textbox(Inches(1), Inches(1), Inches(4), Inches(1)).text_frame.text = text
+        first.shapes.add_connector(MSO_CONNECTOR.STRAIGHT, 0, 0, Inches(1), Inches(1))
+        presentation.slides.add_slide(layout)
+        third = presentation.slides.add_slide(layout)
+        third.shapes.add_textbox(Inches(1), Inches(1), Inches(4), Inches(1)).text_frame.text = "Last slide"
+        buffer = io.BytesIO()
+        presentation.save(buffer)
+
+        upload = make_upload("deck.pptx", buffer.getvalue())
+        assert await FileParserService.parse_file(upload) == (
+            "--- Slide 1 ---\nTitle text\nBody text\n\n--- Slide 3 ---\nLast slide"
+        )
+
+    @pytest.mark.asyncio
+    async def test_max_chars_stops_at_page_boundary(self):
+        upload = make_upload("long.pdf", make_pdf(["First page", "Second page", "Third page"]))
+        assert await FileParserService.parse_file(upload, max_chars=30) == (
+            "--- Page 1 ---\nFirst page\n\n--- Page 2 ---\nSecond page"
+        )
+
+    @pytest.mark.asyncio
+    async def test_unsupported_extension(self):
+        with pytest.raises(HTTPException) as exc_info:
+            await FileParserService.parse_file(make_upload("image.png", b"data"))
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("filename,content", [
+        ("slides.pdf", b"<html><body>not a pdf</body></html>"),
+        ("notes.docx", b"%PDF-1.4 renamed"),
+        ("deck.ppt", b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1legacy"),
+        ("notes.txt", b"text\0with\0nuls"),
+    ])
+    async def test_mismatched_content_is_rejected(self, filename, content):
+        with patch("app.services.file_parser._process_pool") as process_pool:
+            with pytest.raises(HTTPException) as exc_info:
+                await FileParserService.parse_file(make_upload(filename, content))
+        assert exc_info.value.status_code == 400
+        assert exc_info.value.detail == "File contents do not match extension"
+        process_pool.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_empty_txt_fails(self):
+        with pytest.raises(HTTPException) as exc_info:
+            await FileParserService.parse_file(make_upload("empty.txt", b"   "))
+        assert exc_info.value.status_code == 500
+
+    @pytest.mark.asyncio
+    async def test_file_too_large_is_rejected_while_streaming(self):
+        upload = make_upload("big.txt", b"x" * 64)
+        with patch.object(FileParserService, "MAX_FILE_SIZE", 32), \
+                patch.object(FileParserService, "READ_CHUNK_SIZE", 16):
+            with pytest.raises(HTTPException) as exc_info:
+                await FileParserService.parse_file(upload)
+        assert exc_info.value.status_code == 400
+        assert "too large" in exc_info.value.detail
+
+    @pytest.mark.asyncio
+    async def test_file_too_large_is_rejected_before_reading(self):
+        upload = UploadFile(file=io.BytesIO(b"x" * 64), filename="big.pdf", size=64)
+        with patch.object(FileParserService, "MAX_FILE_SIZE", 32), \
+                patch.object(upload, "read") as read:
+            with pytest.raises(HTTPException) as exc_info:
+                await FileParserService.parse_file(upload)
+        assert exc_info.value.status_code == 400
+        read.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_documents_parse_in_worker_process(self):
+        from app.services import file_parser
+
+        upload = make_upload("slides.pdf", make_pdf(["Worker text"]))
+        assert await FileParserService.parse_file(upload) == "--- Page 1 ---\nWorker text"
+
+        pool = file_parser._process_pool()
+        file_parser.shutdown_process_pool()
+        assert file_parser._process_pool() is not pool
+        file_parser.shutdown_process_pool()
+
+    @pytest.mark.asyncio
+    async def test_repeat_upload_is_served_from_cache(self):
+        from app.services import file_parser
+
+        file_parser._parsed_text_cache.clear()
+        content = make_pdf(["Cached page"])
+        assert await FileParserService.parse_file(make_upload("a.pdf", content)) == "--- Page 1 ---\nCached page"
+
+        with patch("app.services.file_parser._process_pool") as process_pool:
+            assert await FileParserService.parse_file(make_upload("b.pdf", content)) == "--- Page 1 ---\nCached page"
+        process_pool.assert_not_called()
@@ -0,0 +1,208 @@
+"""Tests for flagged card service functions."""
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from app.models import Card, Deck, User
+from app.schemas.flagged_card import FlaggedCardCreate
+from app.services.flagged_cards import (
+    count_flagged_for_deck,
+    flag_card,
+    flag_cards_bulk,
+    get_flagged_card_ids_for_deck,
+    get_flagged_cards_for_deck,
+    is_card_flagged,
+    unflag_card,
+)
+
+
+@pytest.mark.unit
+class TestGetFlaggedCardsForDeck:
+    """Test loading a user's flagged cards for a deck."""
+
+    def test_returns_only_flagged_cards(
+        self, db: Session, test_user: User, test_deck: Deck, test_cards: list[Card]
+    ):
+        for card in test_cards[:2]:
+            flag_card(db, test_user, FlaggedCardCreate(card_id=card.id, deck_id=test_deck.id))
+
+        cards = get_flagged_cards_for_deck(db, test_user, test_deck.id)
+        assert sorted(c.id for c in cards) == sorted(c.id for c in test_cards[:2])
+        assert {c.prompt for c in cards} == {c.prompt for c in test_cards[:2]}
+
+    def test_no_flags_returns_empty_list(self, db: Session, test_user: User, test_deck: Deck):
+        assert get_flagged_cards_for_deck(db, test_user, test_deck.id) == []
+
+    def test_other_users_flags_are_excluded(
+        self, db: Session, test_user: User, admin_user: User, test_deck: Deck, test_cards: list[Card]
+    ):
+        flag_card(db, admin_user, FlaggedCardCreate(card_id=test_cards[0].id, deck_id=test_deck.id))
+        assert get_flagged_cards_for_deck(db, test_user, test_deck.id) == []
+
+    def test_missing_deck_raises_404(self, db: Session, test_user: User):
+        with pytest.raises(HTTPException) as exc_info:
+            get_flagged_cards_for_deck(db, test_user, 99999)
+        assert exc_info.value.status_code == 404
+
+
+@pytest.mark.unit
+class TestGetFlaggedCardIdsForDeck:
+    """Test listing a user's flagged card ids for a deck."""
+
+    def test_returns_card_ids(
+        self, db: Session, test_user: User, admin_user: User, test_deck: Deck, test_cards: list[Card]
+    ):
+        for card in test_cards[:2]:
+            flag_card(db, test_user, FlaggedCardCreate(card_id=card.id, deck_id=test_deck.id))
+        flag_card(db, admin_user, FlaggedCardCreate(card_id=test_cards[2].id, deck_id=test_deck.id))
+
+        card_ids = get_flagged_card_ids_for_deck(db, test_user, test_deck.id)
+        assert sorted(card_ids) == sorted(c.id for c in test_cards[:2])
+        assert all(isinstance(card_id, int) for card_id in card_ids)
+
+
+@pytest.mark.unit
+class TestCountFlaggedForDeck:
+    """Test counting a user's flagged cards in a deck."""
+
+    def test_counts_flagged_cards(
+        self, db: Session, test_user: User, test_deck: Deck, test_cards: list[Card]
+    ):
+        assert count_flagged_for_deck(db, test_user, test_deck.id) == 0
+        for card in test_cards[:3]:
+            flag_card(db, test_user, FlaggedCardCreate(card_id=card.id, deck_id=test_deck.id))
+        assert count_flagged_for_deck(db, test_user, test_deck.id) == 3
+
+    def test_count_endpoint(
+        self, client, db: Session, test_user: User, test_user_token: str, test_deck: Deck, test_cards: list[Card]
+    ):
+        flag_card(db, test_user, FlaggedCardCreate(card_id=test_cards[0].id, deck_id=test_deck.id))
+        response = client.get(
+            f"/api/v1/flagged-cards/deck/{test_deck.id}/count",
+            headers={"Authorization": f"Bearer {test_user_token}"},
+        )
+        assert response.status_code == 200
+        assert response.json() == {"count": 1}
+
+    def test_counts_endpoint_serializes_int_keys(
+        self, client, db: Session, test_user: User, test_user_token: str, test_deck: Deck, test_cards: list[Card]
+    ):
+        for card in test_cards[:2]:
+            flag_card(db, test_user, FlaggedCardCreate(card_id=card.id, deck_id=test_deck.id))
+        response = client.get(
+            "/api/v1/flagged-cards/counts",
+            headers={"Authorization": f"Bearer {test_user_token}"},
+        )
+        assert response.status_code == 200
+        assert response.json() == {"counts": {str(test_deck.id): 2}}
+
+
+@pytest.mark.unit
+class TestUnflagCard:
+    """Test flag existence checks and unflagging."""
+
+    def test_is_card_flagged(
+        self, db: Session, test_user: User, test_deck: Deck, test_cards: list[Card]
+    ):
+        card = test_cards[0]
+        assert is_card_flagged(db, test_user, card.id) is False
+        flag_card(db, test_user, FlaggedCardCreate(card_id=card.id, deck_id=test_deck.id))
+        assert is_card_flagged(db, test_user, card.id) is True
+
+    def test_unflag_removes_flag(
+        self, db: Session, test_user: User, test_deck: Deck, test_cards: list[Card]
+    ):
+        card = test_cards[0]
+        flag_card(db, test_user, FlaggedCardCreate(card_id=card.id, deck_id=test_deck.id))
+        unflag_card(db, test_user, card.id)
+        assert is_card_flagged(db, test_user, card.id) is False
+
+    def test_unflag_not_flagged_raises_404(
+        self, db: Session, test_user: User, admin_user: User, test_deck: Deck, test_cards: list[Card]
+    ):
+        card = test_cards[0]
+        flag_card(db, admin_user, FlaggedCardCreate(card_id=card.id, deck_id=test_deck.id))
+        with pytest.raises(HTTPException) as exc_info:
+            unflag_card(db, test_user, card.id)
+        assert exc_info.value.status_code == 404
+        assert is_card_flagged(db, admin_user, card.id) is True
+
+
+@pytest.mark.unit
+class TestFlagCard:
+    """Test flagging cards."""
+
+    def test_flag_card_sets_flagged_at(
+        self, db: Session, test_user: User, test_deck: Deck, test_cards: list[Card]
+    ):
+        flagged = flag_card(db, test_user, FlaggedCardCreate(card_id=test_cards[0].id, deck_id=test_deck.id))
+        assert flagged.id is not None
+        assert flagged.user_id == test_user.id
+        assert flagged.card_id == test_cards[0].id
+        assert flagged.flagged_at is not None
+
+    def test_flagging_twice_returns_existing_flag(
+        self, db: Session, test_user: User, test_deck: Deck, test_cards: list[Card]
+    ):
+        payload = FlaggedCardCreate(card_id=test_cards[0].id, deck_id=test_deck.id)
+        first = flag_card(db, test_user, payload)
+        second = flag_card(db, test_user, payload)
+        assert second == first
+        assert count_flagged_for_deck(db, test_user, test_deck.id) == 1
+
+    def test_card_from_other_deck_rejected(
+        self, db: Session, test_user: User, test_cards: list[Card]
+    ):
+        with pytest.raises(HTTPException) as exc_info:
+            flag_card(db, test_user, FlaggedCardCreate(card_id=test_cards[0].id, deck_id=99999))
+        assert exc_info.value.status_code == 400
+
+
+@pytest.mark.unit
+class TestFlagCardsBulk:
+    """Test flagging several cards at once."""
+
+    def test_flags_all_cards_in_request_order(
+        self, db: Session, test_user: User, test_deck: Deck, test_cards: list[Card]
+    ):
+        existing = flag_card(db, test_user, FlaggedCardCreate(card_id=test_cards[1].id, deck_id=test_deck.id))
+        payloads = [
+            FlaggedCardCreate(card_id=card.id, deck_id=test_deck.id)
+            for card in (test_cards[2], test_cards[1], test_cards[0], test_cards[2])
+        ]
+
+        flags = flag_cards_bulk(db, test_user, payloads)
+        assert [f.card_id for f in flags] == [test_cards[2].id, test_cards[1].id, test_cards[0].id]
+        assert flags[1] == existing
+        assert count_flagged_for_deck(db, test_user, test_deck.id) == 3
+
+    def test_missing_card_flags_nothing(
+        self, db: Session, test_user: User, test_deck: Deck, test_cards: list[Card]
+    ):
+        payloads = [
+            FlaggedCardCreate(card_id=test_cards[0].id, deck_id=test_deck.id),
+            FlaggedCardCreate(card_id=99999, deck_id=test_deck.id),
+        ]
+        with pytest.raises(HTTPException) as exc_info:
+            flag_cards_bulk(db, test_user, payloads)
+        assert exc_info.value.status_code == 404
+        assert count_flagged_for_deck(db, test_user, test_deck.id) == 0
+
+    def test_bulk_endpoint(
+        self, client, test_user_token: str, test_deck: Deck, test_cards: list[Card]
+    ):
+        response = client.post(
+            "/api/v1/flagged-cards/bulk",
+            json={"cards": [{"card_id": card.id, "deck_id": test_deck.id} for card in test_cards[:2]]},
+            headers={"Authorization": f"Bearer {test_user_token}"},
+        )
+        assert response.status_code == 201
+        assert [f["card_id"] for f in response.json()] == [card.id for card in test_cards[:2]]
+
+    def test_bulk_endpoint_rejects_empty_list(self, client, test_user_token: str):
+        response = client.post(
+            "/api/v1/flagged-cards/bulk",
+            json={"cards": []},
+            headers={"Authorization": f"Bearer {test_user_token}"},
+        )
+        assert response.status_code == 422
@@ -4,7 +4,7 @@ import json
 
 import pytest
 from fastapi import HTTPException
-from sqlmodel import Session
+from sqlmodel import Session, select
 
 from app.models import Card, QuizSession, SRSReview, User
 from app.models.enums import CardType, QuizMode, QuizStatus
@@ -14,6 +14,8 @@ from app.services.study import (
     _check_answer_correctness,
     _check_cloze_answer,
     _normalize_answer,
+    _normalize_card_answer,
+    _save_answer,
     create_session,
     due_reviews,
     finish_session,
@@ -38,6 +40,13 @@ class TestNormalizeAnswer:
     def test_normalize_empty(self):
         assert _normalize_answer("") == ""
 
+    def test_user_answers_are_not_memoized(self):
+        card = Card(deck_id=1, type=CardType.SHORT_ANSWER, prompt="Capital?", answer="Paris")
+        _normalize_card_answer.cache_clear()
+        for i in range(10):
+            _check_answer_correctness(card, f"guess {i} " + "x" * 1000)
+        assert _normalize_card_answer.cache_info().currsize == 1
+
 
 @pytest.mark.unit
 class TestCheckClozeAnswer:
@@ -389,6 +398,57 @@ class TestRecordAnswer:
         review = db.exec(select(SRSReview).where(SRSReview.user_id == test_user.id, SRSReview.card_id == card.id)).first()
         assert review is not None
 
+    @pytest.mark.asyncio
+    async def test_record_answer_counts_progress(self, db: Session, test_user: User, quiz_session, test_cards):
+        from app.models import UserDeckProgress
+
+        for card in test_cards[:2]:
+            answer_in = StudyAnswerCreate(card_id=card.id, user_answer="4", quality=4)
+            await record_answer(db, quiz_session, card, test_user, answer_in)
+
+        progress = db.exec(
+            select(UserDeckProgress).where(
+                UserDeckProgress.user_id == test_user.id,
+                UserDeckProgress.deck_id == quiz_session.deck_id,
+            )
+        ).one()
+        assert progress.responses_count == 2
+        assert progress.percent_complete == pytest.approx(200 / len(test_cards))
+
+    @pytest.mark.asyncio
+    async def test_finish_session_resyncs_progress(self, db: Session, test_user: User, quiz_session, test_cards):
+        from app.models import QuizResponse, UserDeckProgress
+
+        card = test_cards[0]
+        answer_in = StudyAnswerCreate(card_id=card.id, user_answer="4", quality=4)
+        response, _ = await record_answer(db, quiz_session, card, test_user, answer_in)
+        db.delete(db.get(QuizResponse, response.id))
+        db.commit()
+
+        finish_session(db, quiz_session, test_user)
+        progress = db.exec(
+            select(UserDeckProgress).where(UserDeckProgress.user_id == test_user.id)
+        ).one()
+        assert progress.responses_count == 0
+        assert progress.percent_complete == 0.0
+
+    def test_repeated_review_answers_update_one_review(self, db: Session, test_user: User, quiz_session, test_cards):
+        quiz_session.mode = QuizMode.REVIEW
+        db.add(quiz_session)
+        db.commit()
+
+        card = test_cards[0]
+        for _ in range(2):
+            answer_in = StudyAnswerCreate(card_id=card.id, user_answer="4", quality=4)
+            _save_answer(db, quiz_session, card, test_user, answer_in, None)
+
+        reviews = db.exec(
+            select(SRSReview).where(SRSReview.user_id == test_user.id, SRSReview.card_id == card.id)
+        ).all()
+        assert len(reviews) == 1
+        assert reviews[0].repetitions == 2
+        assert reviews[0].interval_days == 6
+
 
 @pytest.mark.integration
 class TestDueReviews: